@@ -3,77 +3,239 @@ Socratic Method Bot - Main Application
 FastAPI server for real-time transcription and Socratic dialogue.
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Request, Response
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 import uvicorn
 import asyncio
+import hashlib
+import io
+import json
+import logging
+import logging.handlers
 import os
-import shutil
+import queue
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Literal, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to Starlette's json encoder
+    orjson = None
 
 from modules.pdf_parser import PDFParser
 from modules.ollama_client import OllamaClient
-from modules.whisper_stt import WhisperSTT
-from modules.tts_engine import TTSEngine
+from modules.whisper_stt import WhisperSTT, ResultKind
 from modules.conversation_manager import ConversationManager
 
+logger = logging.getLogger(__name__)
 
 # Request models
 class SessionStartRequest(BaseModel):
     whisper_model: str = "base"
     phrase_timeout: float = 5.0  # Default 5 seconds
+    backend: Literal["openai", "faster"] = "faster"  # faster-whisper (CTranslate2, int8 / int8_float16)
+    vad: bool = True  # Skip silence during decoding (faster backend)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the idle-session sweeper; release pooled Ollama connections on shutdown."""
+    sweeper = asyncio.create_task(evict_idle_sessions())
+    yield
+    sweeper.cancel()
+    ollama_client.close()
+    await ollama_client.aclose()
+
 
+app = FastAPI(title="Socratic Method Bot", lifespan=lifespan)
 
-app = FastAPI(title="Socratic Method Bot")
+# Streamed bot tokens are batched into one frame per window / size threshold
+CHUNK_FLUSH_INTERVAL = 0.04  # seconds
+CHUNK_FLUSH_CHARS = 256
+
+# Audio wait timeouts: tick the pause countdown, otherwise sleep until audio arrives
+PAUSE_TICK = 0.25  # seconds
+IDLE_TICK = 1.0  # seconds
 
 # Mount static files
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+
+def load_page(path: str) -> Tuple[bytes, str]:
+    """Read an HTML page once and compute its ETag."""
+    body = Path(path).read_bytes()
+    return body, f'"{hashlib.md5(body, usedforsecurity=False).hexdigest()}"'
+
+
+# Landing pages are served from memory (restart the server after editing them)
+INDEX_PAGE = load_page("static/index.html")
+CONVERSATION_PAGE = load_page("static/conversation.html")
+
 # Global instances
-conversation_manager = ConversationManager(storage_dir="conversations")
+STORAGE_DIR = "conversations"
+session_store = ConversationManager(storage_dir=STORAGE_DIR)  # Browsing saved sessions
 ollama_client = OllamaClient()
 # tts_engine = TTSEngine(rate=160, volume=0.9)  # Disabled for now (haunting voice)
+# tts_engine = create_tts_engine("piper", model_path="voices/en_US-lessac-medium.onnx", rate=160)
+
+# Parsed PDFs keyed by SHA-256 of the upload (also persisted on disk)
+PDF_CACHE_DIR = os.path.join("uploads", ".cache")
+pdf_cache: Dict[str, Dict] = {}
+os.makedirs(PDF_CACHE_DIR, exist_ok=True)
+
+
+@dataclass(slots=True)
+class Session:
+    """State of one client's session (identified by a cookie)."""
+    pdf_uploaded: bool = False
+    pdf_context: str = ""
+    pdf_metadata: dict = field(default_factory=dict)
+    active: bool = False
+    whisper_stt: Optional[WhisperSTT] = None
+    conversation: ConversationManager = field(
+        default_factory=lambda: ConversationManager(storage_dir=STORAGE_DIR)
+    )
+    connections: int = 0  # Open WebSockets
+    last_seen: float = field(default_factory=time.monotonic)
+
+
+# Session state, keyed by the session cookie
+SESSION_COOKIE = "wrtvoice_session"
+sessions: Dict[str, Session] = {}
+
+# Sessions with no open WebSocket are evicted after this long without a request
+SESSION_IDLE_TTL = 15 * 60  # seconds
+SESSION_SWEEP_INTERVAL = 60  # seconds
+
+
+def lookup_session(connection: Union[Request, WebSocket]) -> Optional[Session]:
+    """Return the session for the client's session cookie, if any."""
+    key = connection.cookies.get(SESSION_COOKIE)
+    session = sessions.get(key) if key else None
+    if session:
+        session.last_seen = time.monotonic()
+    return session
+
+
+async def close_session(session: Session) -> None:
+    """Release a session's Whisper model and save its conversation, if still active."""
+    if session.whisper_stt:
+        session.whisper_stt.shutdown()
+        session.whisper_stt = None
+
+    if session.active:
+        session.conversation.end_session()
+        session.active = False
+
+    await session.conversation.aclose()
+
+
+async def evict_idle_sessions() -> None:
+    """Periodically drop sessions whose client went away (closed tab, no reconnect)."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        now = time.monotonic()
+
+        for key, session in list(sessions.items()):
+            if session.connections or now - session.last_seen < SESSION_IDLE_TTL:
+                continue
+
+            sessions.pop(key, None)
+            logger.info("[SESSION] Evicting idle session %s", session.conversation.session_id)
+            try:
+                await close_session(session)
+            except Exception as e:
+                logger.error("Error closing idle session: %s", e)
+
+
+async def send_json(websocket: WebSocket, payload: dict) -> None:
+    """Send a JSON text frame, encoded with orjson when available."""
+    if orjson is not None:
+        await websocket.send_text(orjson.dumps(payload).decode('utf-8'))
+    else:
+        await websocket.send_json(payload)
 
-# Session state
-current_session = {
-    "pdf_uploaded": False,
-    "pdf_context": "",
-    "pdf_metadata": {},
-    "session_active": False,
-    "whisper_stt": None
-}
+
+def load_cached_pdf(digest: str) -> Optional[Dict]:
+    """Return cached {pdf_context, pdf_metadata} for an upload hash, if any."""
+    cached = pdf_cache.get(digest)
+    if cached is not None:
+        return cached
+
+    try:
+        with open(os.path.join(PDF_CACHE_DIR, f"{digest}.json"), 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+    pdf_cache[digest] = cached
+    return cached
+
+
+def store_cached_pdf(digest: str, parsed: Dict) -> None:
+    """Cache a parsed PDF in memory and on disk for reuse across restarts."""
+    pdf_cache[digest] = parsed
+
+    # The disk cache is best effort; a failed write must not fail the upload
+    filepath = os.path.join(PDF_CACHE_DIR, f"{digest}.json")
+    try:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            json.dump(parsed, f, ensure_ascii=False)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("Could not write PDF cache %s: %s", filepath, e)
+        try:
+            os.remove(filepath)
+        except OSError:
+            pass
+
+
+def page_response(request: Request, page: Tuple[bytes, str]) -> Response:
+    """Return a cached page, or 304 Not Modified if the client's copy is current."""
+    body, etag = page
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=60"}
+
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    return Response(body, media_type="text/html", headers=headers)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def root():
+async def root(request: Request):
     """Serve the landing page."""
-    return FileResponse("static/index.html")
+    return page_response(request, INDEX_PAGE)
 
 
 @app.get("/conversation", response_class=HTMLResponse)
-async def conversation_page():
+async def conversation_page(request: Request):
     """Serve the conversation page."""
-    return FileResponse("static/conversation.html")
+    return page_response(request, CONVERSATION_PAGE)
 
 
 @app.get("/health")
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint."""
     ollama_status = ollama_client.check_connection()
+    session = lookup_session(request)
 
     return {
         "status": "healthy",
         "ollama_connected": ollama_status,
-        "pdf_uploaded": current_session["pdf_uploaded"],
-        "session_active": current_session["session_active"]
+        "pdf_uploaded": session.pdf_uploaded if session else False,
+        "session_active": session.active if session else False
     }
 
 
 @app.post("/upload-pdf")
-async def upload_pdf(file: UploadFile = File(...)):
+async def upload_pdf(request: Request, response: Response, file: UploadFile = File(...)):
     """
     Handle PDF upload and extract first 500 words.
     """
@@ -81,27 +243,38 @@ async def upload_pdf(file: UploadFile = File(...)):
     if not file.filename.endswith('.pdf'):
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-    # Save uploaded file temporarily
-    upload_dir = "uploads"
-    os.makedirs(upload_dir, exist_ok=True)
-
-    # Use UTC for filenames to keep ordering consistent across timezones
-    temp_path = os.path.join(upload_dir, f"temp_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.pdf")
-
     try:
-        with open(temp_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-
-        # Extract text from PDF
-        parser = PDFParser()
-        pdf_context = parser.extract_first_n_words(temp_path, n_words=500)
-        pdf_metadata = parser.get_metadata(temp_path)
-
-        # Store in session
-        current_session["pdf_uploaded"] = True
-        current_session["pdf_context"] = pdf_context
-        current_session["pdf_metadata"] = pdf_metadata
-        current_session["pdf_metadata"]["filename"] = file.filename
+        # Read the upload once; re-uploads of the same file skip parsing
+        data = await file.read()
+        digest = hashlib.sha256(data).hexdigest()
+
+        parsed = load_cached_pdf(digest)
+        if parsed is None:
+            # Extract text from PDF (parsed from memory, no temp file)
+            parser = PDFParser()
+            source = io.BytesIO(data)
+            parsed = {
+                "pdf_context": parser.extract_first_n_words(source, n_words=500),
+                "pdf_metadata": parser.get_metadata(source)
+            }
+            if 'error' not in parsed["pdf_metadata"]:
+                store_cached_pdf(digest, parsed)
+
+        pdf_context = parsed["pdf_context"]
+        pdf_metadata = dict(parsed["pdf_metadata"])
+
+        # Store in the client's session (created on first upload)
+        key = request.cookies.get(SESSION_COOKIE)
+        if key not in sessions:
+            key = uuid.uuid4().hex
+            sessions[key] = Session()
+            response.set_cookie(SESSION_COOKIE, key, httponly=True, samesite="lax")
+
+        session = sessions[key]
+        session.pdf_uploaded = True
+        session.pdf_context = pdf_context
+        session.pdf_metadata = pdf_metadata
+        session.pdf_metadata["filename"] = file.filename
 
         return {
             "success": True,
@@ -112,25 +285,23 @@ async def upload_pdf(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing PDF: {str(e)}")
 
-    finally:
-        # Clean up temp file
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
-
 
 @app.post("/start-session")
-async def start_session(request: SessionStartRequest):
+async def start_session(request: SessionStartRequest, http_request: Request):
     """
     Initialize conversation session with Ollama and Whisper.
     """
     whisper_model = request.whisper_model
     phrase_timeout = request.phrase_timeout
 
-    print(f"[SESSION] Starting session with phrase_timeout={phrase_timeout}s from slider (model={whisper_model})")
+    logger.info("[SESSION] Starting session with phrase_timeout=%ss from slider (model=%s)", phrase_timeout, whisper_model)
 
-    if not current_session["pdf_uploaded"]:
+    session = lookup_session(http_request)
+    if not session or not session.pdf_uploaded:
         raise HTTPException(status_code=400, detail="No PDF uploaded")
 
+    conversation_manager = session.conversation
+
     try:
         # Check Ollama connection
         if not ollama_client.check_connection():
@@ -138,28 +309,43 @@ async def start_session(request: SessionStartRequest):
 
         # Start conversation session
         session_id = conversation_manager.start_session(
-            pdf_context=current_session["pdf_context"],
-            pdf_metadata=current_session["pdf_metadata"]
+            pdf_context=session.pdf_context,
+            pdf_metadata=session.pdf_metadata
         )
 
         # Get initial bot greeting from Ollama
-        initial_response = ollama_client.initialize_context(current_session["pdf_context"])
+        initial_response = ollama_client.initialize_context(session.pdf_context)
         bot_message = initial_response.get("response", "Hello! Let's discuss your essay.")
 
         # Add to conversation
         conversation_manager.add_message('bot', bot_message)
 
         # Initialize Whisper STT with user-specified timeout from slider
-        print(f"[WHISPER] Initializing with phrase_timeout={phrase_timeout}s")
-        current_session["whisper_stt"] = WhisperSTT(
-            model=whisper_model,
-            phrase_timeout=phrase_timeout,  # From slider on upload page
-            record_timeout=2.0,
-            debug=True  # Enable debug logging to track timing issues
-        )
-        print(f"[WHISPER] Initialized. Timeout value in STT: {current_session['whisper_stt'].phrase_timeout}s")
-
-        current_session["session_active"] = True
+        logger.debug("[WHISPER] Initializing with phrase_timeout=%ss", phrase_timeout)
+        # Model load, microphone calibration and warm-up block, so run them off the event loop
+        def init_whisper() -> WhisperSTT:
+            stt = WhisperSTT(
+                model=whisper_model,
+                phrase_timeout=phrase_timeout,  # From slider on upload page
+                record_timeout=2.0,
+                debug=True,  # Enable debug logging to track timing issues
+                backend=request.backend,
+                beam_size=1,
+                vad_filter=request.vad
+            )
+            # Pay the model cold-start cost now rather than on the first utterance
+            stt.warmup()
+            return stt
+
+        # Restarting from a live session: release the previous model, worker and mic
+        if session.whisper_stt:
+            session.whisper_stt.shutdown()
+            session.whisper_stt = None
+
+        session.whisper_stt = await asyncio.to_thread(init_whisper)
+        logger.debug("[WHISPER] Initialized. Timeout value in STT: %ss", session.whisper_stt.phrase_timeout)
+
+        session.active = True
 
         return {
             "success": True,
@@ -179,28 +365,32 @@ async def websocket_conversation(websocket: WebSocket):
     """
     await websocket.accept()
 
-    if not current_session["session_active"]:
-        await websocket.send_json({"error": "No active session"})
+    session = lookup_session(websocket)
+
+    if not session or not session.active:
+        await send_json(websocket, {"error": "No active session"})
         await websocket.close()
         return
 
-    whisper_stt = current_session["whisper_stt"]
+    conversation_manager = session.conversation
+    whisper_stt = session.whisper_stt
 
     if not whisper_stt:
-        await websocket.send_json({"error": "Whisper not initialized"})
+        await send_json(websocket, {"error": "Whisper not initialized"})
         await websocket.close()
         return
 
     # Start listening
+    session.connections += 1
     whisper_stt.start_listening()
 
     try:
         # Send ready signal
-        await websocket.send_json({"type": "ready", "message": "Listening started"})
+        await send_json(websocket, {"type": "ready", "message": "Listening started"})
 
         # Send conversation history (including initial bot greeting)
         for msg in conversation_manager.get_conversation_history():
-            await websocket.send_json({
+            await send_json(websocket, {
                 "type": "bot_response" if msg['speaker'] == 'bot' else "transcription",
                 "text": msg['text'],
                 "timestamp": msg['timestamp'],
@@ -209,144 +399,199 @@ async def websocket_conversation(websocket: WebSocket):
 
         # Track current transcription state to avoid duplicates
         current_student_text = ""
-        last_pausing_time = None
+        last_pausing_t = 0.0
+
+        # Last status sent to the client ("ready" already shows listening)
+        last_status = "listening"
+
+        async def send_status(status: str) -> None:
+            """Send a status frame only when the status actually changes."""
+            nonlocal last_status
+            if status != last_status:
+                await send_json(websocket, {"type": "status", "status": status})
+                last_status = status
 
         # Main loop: process audio and handle transcription
         while True:
-            # Process audio queue - returns single dict or None
-            result = whisper_stt.process_audio_queue()
+            # Process audio queue - returns a single STTResult or None
+            result = await whisper_stt.process_audio_queue_async()
 
             if result:
-                # Handle pausing state (countdown)
-                if result.get('pausing'):
-                    time_remaining = result.get('time_remaining', 0)
-
-                    # Only send pausing updates every 0.5s to reduce spam
-                    if last_pausing_time is None or (datetime.now(timezone.utc) - last_pausing_time).total_seconds() >= 0.5:
-                        await websocket.send_json({
-                            "type": "status",
-                            "status": "pausing",
-                            "time_remaining": time_remaining
+                match result.kind:
+                    # Handle pausing state (countdown)
+                    case ResultKind.PAUSING:
+                        time_remaining = result.time_remaining
+
+                        # Only send pausing updates every 0.5s to reduce spam
+                        now = time.monotonic()
+                        if now - last_pausing_t >= 0.5:
+                            await send_json(websocket, {
+                                "type": "status",
+                                "status": "pausing",
+                                "time_remaining": time_remaining
+                            })
+                            last_pausing_t = now
+                            last_status = "pausing"
+
+                    # Handle phrase complete
+                    case ResultKind.FINAL:
+                        text = result.text
+
+                        # Skip empty phrases
+                        if not text.strip():
+                            await send_status("listening")
+                            current_student_text = ""
+                            last_pausing_t = 0.0
+                            continue
+
+                        # Send final transcription ONLY (no duplicate live transcription)
+                        await send_json(websocket, {
+                            "type": "transcription",
+                            "text": text,
+                            "phrase_complete": True,
+                            "timestamp": result.timestamp.isoformat()
                         })
-                        last_pausing_time = datetime.now(timezone.utc)
-
-                # Handle phrase complete
-                elif result.get('phrase_complete'):
-                    text = result['text']
 
-                    # Skip empty phrases
-                    if not text.strip():
-                        await websocket.send_json({"type": "status", "status": "listening"})
-                        current_student_text = ""
-                        last_pausing_time = None
-                        continue
-
-                    # Send final transcription ONLY (no duplicate live transcription)
-                    await websocket.send_json({
-                        "type": "transcription",
-                        "text": text,
-                        "phrase_complete": True,
-                        "timestamp": result['timestamp'].isoformat()
-                    })
-
-                    # Add student message to conversation
-                    conversation_manager.add_message('student', text)
-
-                    # Send "analyzing" status
-                    await websocket.send_json({"type": "status", "status": "analyzing"})
-
-                    # Generate Socratic response
-                    conversation_history = conversation_manager.get_conversation_history(last_n=10)
-
-                    # Send "responding" status before streaming
-                    await websocket.send_json({"type": "status", "status": "responding"})
-
-                    # Stream response from Ollama word-by-word
-                    full_response = ""
-                    async for chunk in ollama_client.generate_socratic_response_stream(
-                        student_input=text,
-                        pdf_context=current_session["pdf_context"],
-                        conversation_history=conversation_history
-                    ):
-                        if chunk:
-                            full_response += chunk
-                            # Send incremental response
-                            await websocket.send_json({
+                        # History for the LLM, taken before the new statement is added
+                        conversation_history = conversation_manager.get_chat_history()
+
+                        # Add student message to conversation
+                        conversation_manager.add_message('student', text)
+
+                        # Send "analyzing" status
+                        await send_status("analyzing")
+
+                        # Send "responding" status before streaming
+                        await send_status("responding")
+
+                        # Stream response from Ollama word-by-word
+                        # (one wall-clock timestamp per response, not per chunk)
+                        response_timestamp = datetime.now(timezone.utc).isoformat()
+
+                        # Persist the reply to the session log as it streams
+                        stream_id = conversation_manager.begin_bot_message()
+
+                        # Coalesce tokens into fewer frames (time window or size threshold)
+                        chunk_buf = []
+                        chunk_buf_len = 0
+                        last_flush = time.monotonic()
+                        async for chunk in ollama_client.generate_socratic_response_stream(
+                            student_input=text,
+                            pdf_context=session.pdf_context,
+                            conversation_history=conversation_history
+                        ):
+                            if chunk:
+                                chunk_buf.append(chunk)
+                                chunk_buf_len += len(chunk)
+
+                                now = time.monotonic()
+                                if now - last_flush >= CHUNK_FLUSH_INTERVAL or chunk_buf_len >= CHUNK_FLUSH_CHARS:
+                                    # Send incremental response
+                                    batch = "".join(chunk_buf)
+                                    conversation_manager.append_bot_token(stream_id, batch)
+                                    await send_json(websocket, {
+                                        "type": "bot_response_chunk",
+                                        "chunk": batch,
+                                        "timestamp": response_timestamp
+                                    })
+                                    chunk_buf.clear()
+                                    chunk_buf_len = 0
+                                    last_flush = now
+
+                        # Flush whatever is still buffered
+                        if chunk_buf:
+                            batch = "".join(chunk_buf)
+                            conversation_manager.append_bot_token(stream_id, batch)
+                            await send_json(websocket, {
                                 "type": "bot_response_chunk",
-                                "chunk": chunk,
-                                "timestamp": datetime.now(timezone.utc).isoformat()
+                                "chunk": batch,
+                                "timestamp": response_timestamp
                             })
 
-                    # Send completion signal
-                    await websocket.send_json({
-                        "type": "bot_response_complete",
-                        "text": full_response,
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    })
-
-                    # Add bot response to conversation
-                    conversation_manager.add_message('bot', full_response)
-
-                    # TTS disabled for now (haunting voice)
-                    # tts_engine.speak_async(full_response)
-
-                    # Return to listening status
-                    await websocket.send_json({"type": "status", "status": "listening"})
-                    current_student_text = ""
-                    last_pausing_time = None
-
-                # Handle live transcription update (user is speaking)
-                else:
-                    text = result['text']
-
-                    # Only send if text actually changed (avoid duplicates)
-                    if text and text != current_student_text:
-                        current_student_text = text
-                        last_pausing_time = None  # Reset pausing timer
-                        await websocket.send_json({
-                            "type": "transcription",
-                            "text": text,
-                            "phrase_complete": False,
-                            "timestamp": result['timestamp'].isoformat()
+                        # Add bot response to conversation
+                        bot_message = conversation_manager.finalize_bot_message(stream_id)
+
+                        # Send completion signal
+                        await send_json(websocket, {
+                            "type": "bot_response_complete",
+                            "text": bot_message['text'],
+                            "timestamp": bot_message['timestamp']
                         })
-                        # Also update status to listening when user resumes speaking
-                        await websocket.send_json({"type": "status", "status": "listening"})
 
-            # Small delay to prevent busy-waiting
-            await asyncio.sleep(0.25)
+                        # TTS disabled for now (haunting voice)
+                        # tts_engine.speak_async(bot_message['text'])
+                        # (streaming: tts_engine.feed(batch) per batch above, then tts_engine.flush())
+
+                        # Return to listening status
+                        await send_status("listening")
+                        current_student_text = ""
+                        last_pausing_t = 0.0
+
+                    # Handle live transcription update (user is speaking)
+                    case ResultKind.PARTIAL:
+                        text = result.text
+
+                        # Only send if text actually changed (avoid duplicates)
+                        if text and text != current_student_text:
+                            current_student_text = text
+                            last_pausing_t = 0.0  # Reset pausing timer
+                            await send_json(websocket, {
+                                "type": "transcription",
+                                "text": text,
+                                "phrase_complete": False,
+                                "timestamp": result.timestamp.isoformat()
+                            })
+                            # Also update status to listening when user resumes speaking
+                            await send_status("listening")
+
+            # Wake as soon as new audio arrives; tick while a phrase is pending
+            await whisper_stt.wait_for_audio(PAUSE_TICK if whisper_stt.phrase_pending else IDLE_TICK)
 
     except WebSocketDisconnect:
-        print("WebSocket disconnected")
+        logger.info("WebSocket disconnected")
     except Exception as e:
-        print(f"WebSocket error: {e}")
-        await websocket.send_json({"type": "error", "message": str(e)})
+        logger.error("WebSocket error: %s", e)
+        await send_json(websocket, {"type": "error", "message": str(e)})
     finally:
-        # Clean up
+        # Clean up; the idle sweeper evicts the session if the client doesn't come back
+        session.connections -= 1
+        session.last_seen = time.monotonic()
         if whisper_stt:
             whisper_stt.stop_listening()
 
 
 @app.post("/end-session")
-async def end_session():
+async def end_session(request: Request, response: Response):
     """
-    End the current session and save conversation.
+    End the current session, save the conversation and forget the client's session.
     """
-    if not current_session["session_active"]:
+    session = lookup_session(request)
+    if not session or not session.active:
         raise HTTPException(status_code=400, detail="No active session")
 
+    conversation_manager = session.conversation
+
     try:
-        # Save final conversation
-        filepath = conversation_manager.save_session()
+        # Save final conversation (waits for queued writes to land on disk)
+        filepath = conversation_manager.end_session()
+        await conversation_manager.flush()
+
+        # Export as text off the event loop
+        text_filepath = await asyncio.to_thread(conversation_manager.export_as_text)
 
-        # Export as text
-        text_filepath = conversation_manager.export_as_text()
+        # Stop the manager's background writer; nothing is written after this
+        await conversation_manager.aclose()
 
         # Clean up
-        if current_session["whisper_stt"]:
-            current_session["whisper_stt"].stop_listening()
-            current_session["whisper_stt"] = None
+        if session.whisper_stt:
+            session.whisper_stt.shutdown()
+            session.whisper_stt = None
+
+        session.active = False
 
-        current_session["session_active"] = False
+        # Drop the client's state; the next upload starts a fresh session
+        sessions.pop(request.cookies.get(SESSION_COOKIE), None)
+        response.delete_cookie(SESSION_COOKIE)
 
         return {
             "success": True,
@@ -362,20 +607,19 @@ async def end_session():
 
 @app.get("/sessions")
 async def list_sessions():
-    """List all saved conversation sessions."""
-    sessions = conversation_manager.list_sessions()
-    return {"sessions": sessions}
+    """List all saved conversation sessions (newest first)."""
+    return {"sessions": session_store.list_sessions()}
 
 
 @app.get("/sessions/{session_id}")
 async def get_session(session_id: str):
     """Get details of a specific session."""
-    if conversation_manager.load_session(session_id):
+    if session_store.load_session(session_id):
         return {
-            "session_id": conversation_manager.session_id,
-            "pdf_context": conversation_manager.pdf_context,
-            "conversation": conversation_manager.conversation,
-            "metadata": conversation_manager.pdf_metadata
+            "session_id": session_store.session_id,
+            "pdf_context": session_store.pdf_context,
+            "conversation": session_store.conversation,
+            "metadata": session_store.pdf_metadata
         }
     else:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -407,4 +651,28 @@ if __name__ == "__main__":
     print("\nServer will start at: http://localhost:8000")
     print("Press Ctrl+C to stop\n")
 
-    uvicorn.run(app, host="0.0.0.0", port=8000, log_level="info")
+    # Log records are queued and written by a listener thread, keeping
+    # stream I/O off the event loop; uvicorn's loggers propagate to the root.
+    log_queue = queue.SimpleQueue()
+    log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(levelname)s: %(message)s",
+        handlers=[logging.handlers.QueueHandler(log_queue)]
+    )
+    log_listener.start()
+
+    # uvloop + httptools (installed with uvicorn[standard]); uvloop is unavailable on Windows.
+    # Single worker: sessions live in this process's memory.
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=8000,
+        log_level="info",
+        log_config=None,
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        ws="websockets"
+    )
+
+    log_listener.stop()
@@ -93,6 +93,9 @@ echo "Step 6: Installing OpenAI Whisper..."
 echo "----------------------------------------"
 pip install git+https://github.com/openai/whisper.git
 
+echo "Installing faster-whisper (faster CTranslate2 backend)..."
+pip install faster-whisper
+
 # Step 7: Install web framework dependencies
 echo ""
 echo "Step 7: Installing web framework..."
@@ -110,8 +113,8 @@ pip install websockets
 echo "Installing python-multipart..."
 pip install python-multipart
 
-echo "Installing PyPDF2..."
-pip install PyPDF2
+echo "Installing pypdf..."
+pip install pypdf
 
 echo "Installing python-dotenv..."
 pip install python-dotenv
@@ -119,6 +122,9 @@ pip install python-dotenv
 echo "Installing aiohttp (for async streaming)..."
 pip install aiohttp
 
+echo "Installing orjson (fast JSON encoding)..."
+pip install orjson
+
 # Step 8: Verify installation
 echo ""
 echo "Step 8: Verifying installation..."
@@ -131,7 +137,7 @@ packages = {
     'uvicorn': 'Uvicorn',
     'websockets': 'WebSockets',
     'multipart': 'python-multipart',
-    'PyPDF2': 'PyPDF2',
+    'pypdf': 'pypdf',
     'pyttsx3': 'pyttsx3',
     'requests': 'requests',
     'aiohttp': 'aiohttp',
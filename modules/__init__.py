@@ -5,7 +5,7 @@ Socratic Method Bot - Core Modules
 from .pdf_parser import PDFParser
 from .ollama_client import OllamaClient
 from .whisper_stt import WhisperSTT
-from .tts_engine import TTSEngine
+from .tts_engine import TTSEngine, PiperTTSEngine
 from .conversation_manager import ConversationManager
 
 __all__ = [
@@ -13,5 +13,6 @@ __all__ = [
     'OllamaClient',
     'WhisperSTT',
     'TTSEngine',
+    'PiperTTSEngine',
     'ConversationManager'
 ]
@@ -3,16 +3,58 @@ Conversation Manager Module
 Manages conversation flow, storage, and time-stamped JSON persistence.
 """
 
+import asyncio
 import json
+import logging
 import os
+import re
+import threading
+from collections import deque
+from itertools import islice
 from datetime import datetime, timezone
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to stdlib json
+    orjson = None
+
+logger = logging.getLogger(__name__)
 
 class ConversationManager:
     """Manages conversation sessions with JSON storage."""
 
+    # Write a full JSON snapshot after this many messages
+    SNAPSHOT_EVERY = 10
+
+    # Debounce delay (seconds) for background snapshots
+    SNAPSHOT_DELAY = 1.0
+
+    # Number of recent messages kept for fast history access
+    RECENT_WINDOW = 64
+
+    # Speaker labels used when formatting history for the LLM
+    SPEAKER_LABELS = {'student': 'STUDENT', 'bot': 'BOT'}
+
+    # Chat roles and number of recent messages sent to the LLM as history
+    CHAT_ROLES = {'student': 'user', 'bot': 'assistant'}
+    CHAT_HISTORY_WINDOW = 6
+
+    # Bytes read from the start of a session file when rebuilding the index
+    SUMMARY_HEAD_BYTES = 4096
+    SUMMARY_KEYS = ('session_id', 'session_start', 'message_count', 'pdf_metadata')
+    _JSON_SEP = re.compile(r'[\s,]*')
+    _JSON_COLON = re.compile(r'\s*:\s*')
+
+    # Storage directories already created by this process
+    _ready_dirs: set = set()
+
+    # Session indexes shared by all managers of a storage directory
+    _indexes: Dict[str, Dict[str, Dict]] = {}
+    _listings: Dict[str, List[Dict]] = {}
+    _index_lock = threading.Lock()
+
     def __init__(self, storage_dir: str = "conversations"):
         """
         Initialize conversation manager.
@@ -21,7 +63,15 @@ class ConversationManager:
             storage_dir: Directory to store conversation JSON files
         """
         self.storage_dir = storage_dir
-        os.makedirs(storage_dir, exist_ok=True)
+
+        # Create the directory once per process (managers are created per client session)
+        if storage_dir not in self._ready_dirs:
+            os.makedirs(storage_dir, exist_ok=True)
+            self._ready_dirs.add(storage_dir)
+
+        # Summary index of saved sessions (loaded lazily, shared per directory)
+        self._index_path = os.path.join(storage_dir, "_index.json")
+        self._dir_key = os.path.abspath(storage_dir)
 
         # Current session data
         self.session_id: Optional[str] = None
@@ -30,6 +80,35 @@ class ConversationManager:
         self.conversation: List[Dict] = []
         self.session_start: Optional[datetime] = None
 
+        # Recent-message window and memoized formatted history
+        self._recent: deque = deque(maxlen=self.RECENT_WINDOW)
+        self._formatted_cache: Optional[str] = None
+        self._formatted_cache_n: Optional[int] = None
+
+        # Chat messages formatted once per message, ready to send to the LLM
+        self._chat_history: deque = deque(maxlen=self.CHAT_HISTORY_WINDOW)
+
+        # Running message counts (avoid re-scanning the conversation on save)
+        self.student_messages = 0
+        self.bot_messages = 0
+
+        # Append-only JSONL log of messages for the current session
+        self._jsonl_path: Optional[str] = None
+        self._jsonl_fp = None
+
+        # Bot replies being streamed into the log, keyed by stream id
+        self._streams: Dict[int, List[str]] = {}
+        self._stream_seq = 0
+
+        # Snapshot bookkeeping
+        self._dirty = False
+        self._unsaved_messages = 0
+        self._snapshot_task: Optional[asyncio.Task] = None
+
+        # Disk writes are drained by a single writer task off the event loop
+        self._write_q: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
     def start_session(self, pdf_context: str, pdf_metadata: Optional[Dict] = None) -> str:
         """
         Start a new conversation session.
@@ -39,16 +118,44 @@ class ConversationManager:
             pdf_metadata: Metadata about the PDF
 
         Returns:
-            Session ID (timestamp-based)
+            Session ID (timestamp-based, with a numeric suffix if the
+            second is already taken)
         """
         # Use timezone-aware UTC to avoid local/UTC mismatches
         self.session_start = datetime.now(timezone.utc)
-        self.session_id = self.session_start.strftime("%Y-%m-%d_%H-%M-%S")
         self.pdf_context = pdf_context
         self.pdf_metadata = pdf_metadata or {}
         self.conversation = []
+        self._reset_recent()
+        self.student_messages = 0
+        self.bot_messages = 0
+        self._dirty = False
+        self._unsaved_messages = 0
+        self._streams = {}
+        self._stream_seq = 0
+
+        # Each message is appended here; the aggregated JSON is only a snapshot.
+        # The log is created exclusively so two sessions started in the same
+        # second (other clients, or a quick restart) never share files.
+        self._close_log()
+        base_id = self.session_start.strftime("%Y-%m-%d_%H-%M-%S")
+        self.session_id = base_id
+        suffix = 1
+        while True:
+            self._jsonl_path = os.path.join(self.storage_dir, f"{self.session_id}.jsonl")
+            try:
+                if os.path.exists(os.path.join(self.storage_dir, f"{self.session_id}.json")):
+                    raise FileExistsError(self._jsonl_path)
+                self._jsonl_fp = open(self._jsonl_path, 'x', encoding='utf-8')
+                break
+            except FileExistsError:
+                suffix += 1
+                self.session_id = f"{base_id}_{suffix}"
+
+        # Initial snapshot so the session can be recovered from its log
+        self.save_session()
 
-        print(f"Started session: {self.session_id}")
+        logger.info("Started session: %s", self.session_id)
         return self.session_id
 
     def add_message(
@@ -89,12 +196,226 @@ class ConversationManager:
             message["metadata"] = metadata
 
         self.conversation.append(message)
-
-        # Auto-save after each message
-        self.save_session()
+        self._recent.append(message)
+        self._chat_history.append(self._chat_message(message))
+        self._formatted_cache = None
+
+        if speaker == 'student':
+            self.student_messages += 1
+        elif speaker == 'bot':
+            self.bot_messages += 1
+
+        # O(1) append to the session log instead of rewriting the whole file
+        if self._jsonl_fp:
+            self._submit(self._append_line, self._jsonl_fp, self._dumps(message))
+
+        # Snapshot the aggregated JSON every N messages, otherwise debounce it
+        self._unsaved_messages += 1
+        if self._unsaved_messages >= self.SNAPSHOT_EVERY:
+            self.save_session()
+        else:
+            self._schedule_snapshot()
 
         return message
 
+    def begin_bot_message(self) -> int:
+        """
+        Start a bot message that is persisted incrementally while it streams.
+
+        Returns:
+            Stream id to pass to append_bot_token / finalize_bot_message
+        """
+        self._stream_seq += 1
+        stream_id = self._stream_seq
+        self._streams[stream_id] = []
+
+        if self._jsonl_fp:
+            record = {"stream": stream_id, "timestamp": datetime.now(timezone.utc).isoformat()}
+            self._submit(self._append_line, self._jsonl_fp, self._dumps(record))
+
+        return stream_id
+
+    def append_bot_token(self, stream_id: int, chunk: str) -> None:
+        """
+        Append a chunk of a streaming bot message to the session log.
+
+        Args:
+            stream_id: Id returned by begin_bot_message
+            chunk: Text chunk
+        """
+        self._streams[stream_id].append(chunk)
+
+        if self._jsonl_fp:
+            self._submit(self._append_line, self._jsonl_fp, self._dumps({"stream": stream_id, "chunk": chunk}))
+
+    def finalize_bot_message(self, stream_id: int, metadata: Optional[Dict] = None) -> Dict:
+        """
+        Finish a streaming bot message and add it to the conversation.
+
+        Args:
+            stream_id: Id returned by begin_bot_message
+            metadata: Additional metadata
+
+        Returns:
+            The message dictionary
+        """
+        text = "".join(self._streams.pop(stream_id, []))
+
+        if self._jsonl_fp:
+            self._submit(self._append_line, self._jsonl_fp, self._dumps({"stream": stream_id, "done": True}))
+
+        return self.add_message('bot', text, metadata=metadata)
+
+    def _reset_recent(self) -> None:
+        """Rebuild the recent-message window from the full conversation."""
+        self._recent = deque(self.conversation, maxlen=self.RECENT_WINDOW)
+        self._chat_history = deque(
+            map(self._chat_message, self.conversation[-self.CHAT_HISTORY_WINDOW:]),
+            maxlen=self.CHAT_HISTORY_WINDOW
+        )
+        self._formatted_cache = None
+
+    @classmethod
+    def _chat_message(cls, message: Dict) -> Dict[str, str]:
+        """Format a message for the LLM chat API."""
+        return {"role": cls.CHAT_ROLES.get(message['speaker'], 'user'), "content": message['text']}
+
+    def _schedule_snapshot(self) -> None:
+        """Mark the session dirty and schedule a coalesced background snapshot."""
+        self._dirty = True
+
+        if self._snapshot_task and not self._snapshot_task.done():
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop (CLI usage) - rely on periodic/end-of-session saves
+            return
+
+        self._snapshot_task = loop.create_task(self._snapshot_later())
+
+    async def _snapshot_later(self) -> None:
+        """Write a snapshot after a short delay if the session is still dirty."""
+        await asyncio.sleep(self.SNAPSHOT_DELAY)
+        if self._dirty and self.session_id:
+            self.save_session()
+
+    def _close_log(self) -> None:
+        """Close the JSONL log of the current session, if open."""
+        if self._jsonl_fp:
+            self._submit(self._jsonl_fp.close)
+            self._jsonl_fp = None
+
+    def _submit(self, func: Callable, *args) -> None:
+        """
+        Run a disk write on the writer task.
+
+        Writes are executed in order in a worker thread so they never block
+        the event loop. Without a running loop (CLI usage, or when called from
+        a worker thread) the write happens inline.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            func(*args)
+            return
+
+        if self._writer_task is None or self._writer_task.done():
+            self._write_q = asyncio.Queue()
+            self._writer_task = loop.create_task(self._writer_loop(self._write_q))
+
+        self._write_q.put_nowait((func, args))
+
+    async def _writer_loop(self, queue: asyncio.Queue) -> None:
+        """Drain queued disk writes one at a time in a worker thread."""
+        while True:
+            func, args = await queue.get()
+            try:
+                await asyncio.to_thread(func, *args)
+            except Exception as e:
+                logger.error("Error writing session data: %s", e)
+            finally:
+                queue.task_done()
+
+    async def flush(self) -> None:
+        """Wait until all queued disk writes have completed."""
+        if self._write_q is not None:
+            await self._write_q.join()
+
+    async def aclose(self) -> None:
+        """Wait for queued disk writes, then stop the background tasks."""
+        if self._snapshot_task and not self._snapshot_task.done():
+            self._snapshot_task.cancel()
+        self._snapshot_task = None
+        if self._dirty and self.session_id:
+            self.save_session()
+
+        await self.flush()
+
+        if self._writer_task is not None:
+            self._writer_task.cancel()
+            try:
+                await self._writer_task
+            except asyncio.CancelledError:
+                pass
+            self._writer_task = None
+            self._write_q = None
+
+    @staticmethod
+    def _dumps(obj) -> str:
+        """Encode an object as a compact single-line JSON string."""
+        if orjson is not None:
+            return orjson.dumps(obj).decode('utf-8')
+        return json.dumps(obj, ensure_ascii=False)
+
+    @staticmethod
+    def _append_line(fp, line: str) -> None:
+        """Append one line to an open log file and flush it."""
+        fp.write(line + "\n")
+        fp.flush()
+
+    @staticmethod
+    def _write_json(filepath: str, data: Dict, fsync: bool = False) -> None:
+        """
+        Atomically write data to a JSON file.
+
+        The data is written to a .tmp sibling which then replaces the target,
+        so a crash never leaves a partially written file behind.
+
+        Args:
+            filepath: Target file
+            data: Data to serialize
+            fsync: Force the data to disk before replacing (end of session)
+        """
+        tmp_path = filepath + ".tmp"
+
+        if orjson is not None:
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+        else:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        os.replace(tmp_path, filepath)
+
+    def end_session(self) -> str:
+        """
+        Write the final session snapshot and close the message log.
+
+        Returns:
+            Path to saved file
+        """
+        filepath = self.save_session(fsync=True)
+        self._close_log()
+        return filepath
+
     def get_conversation_history(self, last_n: Optional[int] = None) -> List[Dict]:
         """
         Get conversation history.
@@ -106,9 +427,21 @@ class ConversationManager:
             List of message dictionaries
         """
         if last_n:
+            if last_n <= self.RECENT_WINDOW:
+                start = max(0, len(self._recent) - last_n)
+                return list(islice(self._recent, start, None))
             return self.conversation[-last_n:]
         return self.conversation
 
+    def get_chat_history(self) -> List[Dict[str, str]]:
+        """
+        Get recent history as LLM chat messages.
+
+        Returns:
+            List of dictionaries with 'role' and 'content' (oldest first)
+        """
+        return list(self._chat_history)
+
     def get_formatted_history(self, last_n: Optional[int] = None) -> str:
         """
         Get formatted conversation history for LLM context.
@@ -119,22 +452,29 @@ class ConversationManager:
         Returns:
             Formatted string
         """
+        # Reuse the last result until a new message arrives
+        if self._formatted_cache is not None and self._formatted_cache_n == last_n:
+            return self._formatted_cache
+
         messages = self.get_conversation_history(last_n)
         formatted = []
 
         for msg in messages:
-            speaker = msg['speaker'].upper()
+            speaker = self.SPEAKER_LABELS.get(msg['speaker']) or msg['speaker'].upper()
             text = msg['text']
             formatted.append(f"{speaker}: {text}")
 
-        return "\n".join(formatted)
+        self._formatted_cache = "\n".join(formatted)
+        self._formatted_cache_n = last_n
+        return self._formatted_cache
 
-    def save_session(self, filepath: Optional[str] = None) -> str:
+    def save_session(self, filepath: Optional[str] = None, fsync: bool = False) -> str:
         """
         Save current session to JSON file.
 
         Args:
             filepath: Optional custom filepath (otherwise auto-generated)
+            fsync: Force the snapshot to disk (skipped for periodic autosaves)
 
         Returns:
             Path to saved file
@@ -142,9 +482,11 @@ class ConversationManager:
         if not self.session_id:
             raise ValueError("No active session to save")
 
+        update_index = not filepath
         if not filepath:
             filepath = os.path.join(self.storage_dir, f"{self.session_id}.json")
 
+        # Summary fields come first so they can be read from the file head
         session_data = {
             "session_id": self.session_id,
             "session_start": self.session_start.isoformat() if self.session_start else None,
@@ -152,16 +494,24 @@ class ConversationManager:
                 (datetime.now(timezone.utc) - self.session_start).total_seconds()
                 if self.session_start else None
             ),
-            "pdf_context": self.pdf_context,
-            "pdf_metadata": self.pdf_metadata,
-            "conversation": self.conversation,
             "message_count": len(self.conversation),
-            "student_messages": sum(1 for msg in self.conversation if msg['speaker'] == 'student'),
-            "bot_messages": sum(1 for msg in self.conversation if msg['speaker'] == 'bot')
+            "student_messages": self.student_messages,
+            "bot_messages": self.bot_messages,
+            "pdf_metadata": dict(self.pdf_metadata),
+            "pdf_context": self.pdf_context,
+            # Shallow copy: the writer thread serializes while new messages arrive
+            "conversation": list(self.conversation)
         }
 
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
+        self._submit(self._write_json, filepath, session_data, fsync)
+
+        if update_index:
+            self._load_index()[self.session_id] = self._summarize(session_data)
+            self._listings.pop(self._dir_key, None)
+            self._submit(self._write_index)
+
+        self._dirty = False
+        self._unsaved_messages = 0
 
         return filepath
 
@@ -177,52 +527,210 @@ class ConversationManager:
         """
         filepath = os.path.join(self.storage_dir, f"{session_id}.json")
 
-        if not os.path.exists(filepath):
-            print(f"Session file not found: {filepath}")
-            return False
-
         try:
             with open(filepath, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+        except FileNotFoundError:
+            logger.warning("Session file not found: %s", filepath)
+            return False
+        except Exception as e:
+            logger.error("Error loading session: %s", e)
+            return False
 
-            self.session_id = data['session_id']
-            self.session_start = datetime.fromisoformat(data['session_start']) if data.get('session_start') else None
-            self.pdf_context = data['pdf_context']
-            self.pdf_metadata = data.get('pdf_metadata', {})
-            self.conversation = data['conversation']
+        # Parse everything that can fail before touching the current session
+        try:
+            loaded_id = data['session_id']
+            session_start = datetime.fromisoformat(data['session_start']) if data.get('session_start') else None
+            pdf_context = data['pdf_context']
+            conversation = data['conversation']
+
+            # The JSONL log is authoritative when present (snapshot may lag behind)
+            try:
+                conversation = self._replay_log(os.path.join(self.storage_dir, f"{session_id}.jsonl"))
+            except FileNotFoundError:
+                pass
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            logger.error("Error loading session: %s", e)
+            return False
 
-            print(f"Loaded session: {self.session_id} ({len(self.conversation)} messages)")
-            return True
+        self.session_id = loaded_id
+        self.session_start = session_start
+        self.pdf_context = pdf_context
+        self.pdf_metadata = data.get('pdf_metadata', {})
+        self.conversation = conversation
 
-        except Exception as e:
-            print(f"Error loading session: {e}")
-            return False
+        self._reset_recent()
+        self.student_messages = sum(1 for msg in self.conversation if msg.get('speaker') == 'student')
+        self.bot_messages = sum(1 for msg in self.conversation if msg.get('speaker') == 'bot')
 
-    def list_sessions(self) -> List[Dict]:
+        logger.info("Loaded session: %s (%d messages)", self.session_id, len(self.conversation))
+        return True
+
+    @staticmethod
+    def _replay_log(jsonl_path: str) -> List[Dict]:
         """
-        List all saved sessions.
+        Rebuild a conversation from its JSONL message log.
+
+        Bot replies that were still streaming when the log stopped (e.g. a
+        disconnect or crash mid-generation) are recovered as incomplete
+        messages.
+
+        Args:
+            jsonl_path: Path to the session's .jsonl file
 
         Returns:
-            List of session info dictionaries
+            List of message dictionaries
         """
-        sessions = []
+        conversation = []
+        streams: Dict[int, Dict] = {}
 
-        for filename in sorted(os.listdir(self.storage_dir), reverse=True):
-            if filename.endswith('.json'):
-                filepath = os.path.join(self.storage_dir, filename)
+        with open(jsonl_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
                 try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        sessions.append({
-                            'session_id': data['session_id'],
-                            'session_start': data.get('session_start'),
-                            'message_count': data.get('message_count', 0),
-                            'pdf_title': data.get('pdf_metadata', {}).get('title', 'Unknown')
-                        })
-                except Exception:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Partially written trailing line (e.g. crash mid-write)
                     continue
 
-        return sessions
+                if 'stream' not in record:
+                    conversation.append(record)
+                elif record.get('done'):
+                    streams.pop(record['stream'], None)
+                elif 'chunk' in record:
+                    streams.setdefault(record['stream'], {'timestamp': None, 'chunks': []})['chunks'].append(record['chunk'])
+                else:
+                    streams[record['stream']] = {'timestamp': record.get('timestamp'), 'chunks': []}
+
+        for stream in streams.values():
+            conversation.append({
+                "timestamp": stream['timestamp'],
+                "speaker": "bot",
+                "text": "".join(stream['chunks']),
+                "metadata": {"incomplete": True}
+            })
+
+        return conversation
+
+    def list_sessions(self) -> List[Dict]:
+        """
+        List all saved sessions, newest first.
+
+        Session ids are "%Y-%m-%d_%H-%M-%S" timestamps, so sorting them as
+        strings orders sessions chronologically without parsing dates. The
+        sorted listing is cached until a session is saved.
+
+        Returns:
+            List of session info dictionaries
+        """
+        listing = self._listings.get(self._dir_key)
+        if listing is None:
+            index = self._load_index()
+            listing = [index[session_id] for session_id in sorted(index, reverse=True)]
+            self._listings[self._dir_key] = listing
+
+        return list(listing)
+
+    @staticmethod
+    def _summarize(data: Dict) -> Dict:
+        """Build the index entry for a session's data."""
+        return {
+            'session_id': data['session_id'],
+            'session_start': data.get('session_start'),
+            'message_count': data.get('message_count', 0),
+            'pdf_title': data.get('pdf_metadata', {}).get('title', 'Unknown')
+        }
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """
+        Return the session index, reading it from disk on first use.
+
+        If the index file is missing or unreadable it is rebuilt once by
+        scanning the stored session files.
+        """
+        index = self._indexes.get(self._dir_key)
+        if index is not None:
+            return index
+
+        try:
+            with open(self._index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            index = self._rebuild_index()
+            self._write_json(self._index_path, index)
+
+        return self._indexes.setdefault(self._dir_key, index)
+
+    def _write_index(self) -> None:
+        """Write the current session index (latest state wins across managers)."""
+        with self._index_lock:
+            self._write_json(self._index_path, dict(self._load_index()))
+
+    def _rebuild_index(self) -> Dict[str, Dict]:
+        """Scan stored session files and build the session index."""
+        index = {}
+
+        with os.scandir(self.storage_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json') and not entry.name.startswith('_'):
+                    try:
+                        summary = self._read_summary(entry.path)
+                        index[summary['session_id']] = summary
+                    except Exception:
+                        continue
+
+        return index
+
+    @classmethod
+    def _read_summary(cls, filepath: str) -> Dict:
+        """
+        Read the index entry of a session file.
+
+        Only the head of the file is parsed when the summary fields appear
+        before the (large) context and conversation; older files fall back
+        to a full parse.
+        """
+        with open(filepath, 'rb') as f:
+            head = f.read(cls.SUMMARY_HEAD_BYTES)
+            data = cls._parse_head(head.decode('utf-8', errors='ignore'))
+
+            if data is None:
+                f.seek(0)
+                raw = f.read()
+                data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+        return cls._summarize(data)
+
+    @classmethod
+    def _parse_head(cls, text: str) -> Optional[Dict]:
+        """
+        Decode leading top-level members of a (possibly truncated) JSON object.
+
+        Returns:
+            Dictionary containing at least SUMMARY_KEYS (or every member if the
+            object ends first), or None if the head was cut off before that
+        """
+        decoder = json.JSONDecoder()
+        data = {}
+
+        pos = text.find('{') + 1
+        if not pos:
+            return None
+
+        try:
+            while not all(key in data for key in cls.SUMMARY_KEYS):
+                pos = cls._JSON_SEP.match(text, pos).end()
+                if text[pos] == '}':
+                    break
+                key, pos = decoder.raw_decode(text, pos)
+                pos = cls._JSON_COLON.match(text, pos).end()
+                data[key], pos = decoder.raw_decode(text, pos)
+        except (ValueError, IndexError, AttributeError):
+            return None
+
+        return data if 'session_id' in data else None
 
     def export_as_text(self, output_path: Optional[str] = None) -> str:
         """
@@ -267,6 +775,7 @@ class ConversationManager:
 
 if __name__ == "__main__":
     # Test the conversation manager
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
     print("Testing Conversation Manager...\n")
 
     manager = ConversationManager(storage_dir="conversations")
@@ -299,7 +808,7 @@ if __name__ == "__main__":
     print(manager.get_formatted_history())
 
     # Save session
-    filepath = manager.save_session()
+    filepath = manager.end_session()
     print(f"\nSaved session to: {filepath}")
 
     # List sessions
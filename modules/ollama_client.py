@@ -5,10 +5,37 @@ Handles communication with local Ollama instance running llama3.1 for Socratic d
 
 import requests
 import json
+import socket
+from requests.adapters import HTTPAdapter
 from typing import List, Dict, Optional, AsyncGenerator
 import aiohttp
 import asyncio
 
+try:
+    import orjson
+except ImportError:  # Optional speedup; falls back to stdlib json
+    orjson = None
+
+
+def _loads(data: bytes):
+    """Decode JSON from bytes, with orjson when available (no .decode() needed)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets disable Nagle and enable TCP keep-alive."""
+
+    SOCKET_OPTIONS = [
+        (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = self.SOCKET_OPTIONS
+        super().init_poolmanager(*args, **kwargs)
+
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
@@ -26,6 +53,20 @@ Your role:
 
 Remember: Your goal is to strengthen their argument by making them defend it thoroughly."""
 
+    GREETING_PROMPT = """The student has just submitted the essay above.
+
+Generate a brief welcoming message (under 40 words) that:
+1. Acknowledges you've reviewed their essay
+2. Asks them to explain their main thesis or central argument in their own words
+
+Be encouraging but set an intellectually rigorous tone."""
+
+    # Keep the model and its prompt cache loaded between turns
+    KEEP_ALIVE = "30m"
+
+    # Number of essays whose system message is cached
+    SYSTEM_CACHE_SIZE = 32
+
     def __init__(self, base_url: str = "http://localhost:11434", model: str = "llama3.1:latest"):
         """
         Initialize Ollama client.
@@ -39,6 +80,84 @@ Remember: Your goal is to strengthen their argument by making them defend it tho
         self.api_url = f"{base_url}/api/generate"
         self.chat_url = f"{base_url}/api/chat"
 
+        # One pooled keep-alive connection set for all sync requests
+        self.session = requests.Session()
+        adapter = _KeepAliveAdapter(pool_connections=1, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        # System messages keyed by essay context (byte-identical prefix per essay)
+        self._system_messages: Dict[str, Dict[str, str]] = {}
+
+        # Streaming session, created lazily on the running event loop
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        self._aio_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def close(self) -> None:
+        """Close pooled HTTP connections."""
+        self.session.close()
+
+    async def aclose(self) -> None:
+        """Close the streaming (aiohttp) session."""
+        if self._aio_session is not None and not self._aio_session.closed:
+            await self._aio_session.close()
+        self._aio_session = None
+        self._aio_loop = None
+
+    def _get_aio_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared aiohttp session, creating it if needed.
+
+        A new session is created if the previous one was closed or belongs
+        to a different event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._aio_session is None or self._aio_session.closed or self._aio_loop is not loop:
+            self._aio_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=4, force_close=False, enable_cleanup_closed=True)
+            )
+            self._aio_loop = loop
+        return self._aio_session
+
+    @staticmethod
+    async def _iter_ndjson(response: aiohttp.ClientResponse) -> AsyncGenerator[Dict, None]:
+        """
+        Decode a newline-delimited JSON stream.
+
+        Reads whatever bytes are available (one await per network read rather
+        than per line) and splits complete lines out of a local buffer.
+
+        Args:
+            response: Streaming aiohttp response
+
+        Yields:
+            Decoded JSON objects (malformed lines are skipped)
+        """
+        buf = bytearray()
+        while True:
+            data = await response.content.readany()
+            if not data:
+                break
+            buf.extend(data)
+
+            start = 0
+            while (nl := buf.find(b'\n', start)) != -1:
+                line = bytes(buf[start:nl])
+                start = nl + 1
+                if line.strip():
+                    try:
+                        yield _loads(line)
+                    except json.JSONDecodeError:
+                        continue
+            del buf[:start]
+
+        # Final line without a trailing newline
+        if buf.strip():
+            try:
+                yield _loads(bytes(buf))
+            except json.JSONDecodeError:
+                pass
+
     def check_connection(self) -> bool:
         """
         Check if Ollama server is accessible.
@@ -47,7 +166,7 @@ Remember: Your goal is to strengthen their argument by making them defend it tho
             True if server is running, False otherwise
         """
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
+            response = self.session.get(f"{self.base_url}/api/tags", timeout=5)
             return response.status_code == 200
         except Exception:
             return False
@@ -62,19 +181,67 @@ Remember: Your goal is to strengthen their argument by making them defend it tho
         Returns:
             Initial bot response welcoming the student
         """
-        initial_prompt = f"""The student has submitted an essay. Here are the first 500 words:
+        # Same system message as every later turn, so this call also warms
+        # Ollama's cache for the essay prefix before the student speaks
+        return self.chat(
+            [
+                self._system_message(pdf_context),
+                {"role": "user", "content": self.GREETING_PROMPT}
+            ],
+            options=self._socratic_options(pdf_context),
+            keep_alive=self.KEEP_ALIVE
+        )
 
----
-{pdf_context}
----
+    def _system_message(self, pdf_context: str) -> Dict[str, str]:
+        """
+        Build the system message (Socratic prompt + essay context).
 
-Generate a brief welcoming message (under 40 words) that:
-1. Acknowledges you've reviewed their essay
-2. Asks them to explain their main thesis or central argument in their own words
+        The message is cached per essay so every turn sends a byte-identical
+        prefix, letting Ollama reuse its KV cache for it.
 
-Be encouraging but set an intellectually rigorous tone."""
+        Args:
+            pdf_context: Original essay excerpt
 
-        return self.generate(initial_prompt)
+        Returns:
+            Chat message dictionary with 'role' and 'content'
+        """
+        message = self._system_messages.get(pdf_context)
+        if message is None:
+            if len(self._system_messages) >= self.SYSTEM_CACHE_SIZE:
+                self._system_messages.clear()
+            message = {
+                "role": "system",
+                "content": f"{self.SOCRATIC_SYSTEM_PROMPT}\n\nEssay Context (first 500 words):\n{pdf_context}"
+            }
+            self._system_messages[pdf_context] = message
+        return message
+
+    def _socratic_messages(
+        self,
+        student_input: str,
+        pdf_context: str,
+        conversation_history: List[Dict[str, str]]
+    ) -> List[Dict[str, str]]:
+        """
+        Build the chat messages for a Socratic turn.
+
+        Immutable content comes first (system prompt + essay); only the
+        recent history and the latest statement vary between turns.
+        """
+        return [
+            self._system_message(pdf_context),
+            *conversation_history,
+            {"role": "user", "content": student_input}
+        ]
+
+    def _socratic_options(self, pdf_context: str) -> Dict:
+        """Sampling options; num_keep pins the system prefix if the context window shifts."""
+        return {
+            "temperature": 0.7,
+            "top_p": 0.9,
+            # Rough estimate (~4 characters per token) of the system prefix length
+            "num_keep": len(self._system_message(pdf_context)["content"]) // 4,
+        }
 
     def generate_socratic_response(
         self,
@@ -88,31 +255,17 @@ Be encouraging but set an intellectually rigorous tone."""
         Args:
             student_input: What the student just said
             pdf_context: Original essay excerpt
-            conversation_history: Previous exchanges
+            conversation_history: Recent exchanges as chat messages ('role'/'content'),
+                not including student_input
 
         Returns:
             Dictionary with 'response' and 'done' keys
         """
-        # Format conversation history
-        history_text = "\n".join([
-            f"{msg['speaker'].upper()}: {msg['text']}"
-            for msg in conversation_history[-6:]  # Last 6 exchanges for context
-        ])
-
-        prompt = f"""{self.SOCRATIC_SYSTEM_PROMPT}
-
-Essay Context (first 500 words):
-{pdf_context}
-
-Recent Conversation:
-{history_text if history_text else "(No prior conversation)"}
-
-Student's latest statement:
-"{student_input}"
-
-Your Socratic response:"""
-
-        return self.generate(prompt)
+        return self.chat(
+            self._socratic_messages(student_input, pdf_context, conversation_history),
+            options=self._socratic_options(pdf_context),
+            keep_alive=self.KEEP_ALIVE
+        )
 
     async def generate_socratic_response_stream(
         self,
@@ -126,31 +279,17 @@ Your Socratic response:"""
         Args:
             student_input: What the student just said
             pdf_context: Original essay excerpt
-            conversation_history: Previous exchanges
+            conversation_history: Recent exchanges as chat messages ('role'/'content'),
+                not including student_input
 
         Yields:
             Chunks of the response as they're generated
         """
-        # Format conversation history
-        history_text = "\n".join([
-            f"{msg['speaker'].upper()}: {msg['text']}"
-            for msg in conversation_history[-6:]  # Last 6 exchanges for context
-        ])
-
-        prompt = f"""{self.SOCRATIC_SYSTEM_PROMPT}
-
-Essay Context (first 500 words):
-{pdf_context}
-
-Recent Conversation:
-{history_text if history_text else "(No prior conversation)"}
-
-Student's latest statement:
-"{student_input}"
-
-Your Socratic response:"""
-
-        async for chunk in self.generate_stream(prompt):
+        async for chunk in self.chat_stream(
+            self._socratic_messages(student_input, pdf_context, conversation_history),
+            options=self._socratic_options(pdf_context),
+            keep_alive=self.KEEP_ALIVE
+        ):
             yield chunk
 
     async def generate_stream(self, prompt: str) -> AsyncGenerator[str, None]:
@@ -174,17 +313,12 @@ Your Socratic response:"""
                 }
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(self.api_url, json=payload) as response:
-                    async for line in response.content:
-                        if line:
-                            try:
-                                data = json.loads(line.decode('utf-8'))
-                                chunk = data.get("response", "")
-                                if chunk:
-                                    yield chunk
-                            except json.JSONDecodeError:
-                                continue
+            session = self._get_aio_session()
+            async with session.post(self.api_url, json=payload) as response:
+                async for data in self._iter_ndjson(response):
+                    chunk = data.get("response", "")
+                    if chunk:
+                        yield chunk
 
         except Exception as e:
             yield f"[Error: {str(e)}]"
@@ -211,30 +345,75 @@ Your Socratic response:"""
                 }
             }
 
-            response = requests.post(self.api_url, json=payload, timeout=60)
+            response = self.session.post(self.api_url, json=payload, timeout=60)
             response.raise_for_status()
 
             if stream:
                 return {"response": response.text, "stream": True}
             else:
-                result = response.json()
+                result = _loads(response.content)
                 return {
                     "response": result.get("response", "").strip(),
                     "done": result.get("done", False)
                 }
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             return {
                 "response": f"Error communicating with Ollama: {str(e)}",
                 "error": True
             }
 
-    def chat(self, messages: List[Dict[str, str]]) -> Dict:
+    async def chat_stream(
+        self,
+        messages: List[Dict[str, str]],
+        options: Optional[Dict] = None,
+        keep_alive: Optional[str] = None
+    ) -> AsyncGenerator[str, None]:
+        """
+        Use chat endpoint with streaming.
+
+        Args:
+            messages: List of message dictionaries with 'role' and 'content'
+            options: Model options (temperature, num_keep, ...)
+            keep_alive: How long Ollama keeps the model (and its cache) loaded
+
+        Yields:
+            Response chunks as they arrive
+        """
+        try:
+            payload = {
+                "model": self.model,
+                "messages": messages,
+                "stream": True
+            }
+            if options:
+                payload["options"] = options
+            if keep_alive:
+                payload["keep_alive"] = keep_alive
+
+            session = self._get_aio_session()
+            async with session.post(self.chat_url, json=payload) as response:
+                async for data in self._iter_ndjson(response):
+                    chunk = data.get("message", {}).get("content", "")
+                    if chunk:
+                        yield chunk
+
+        except Exception as e:
+            yield f"[Error: {str(e)}]"
+
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        options: Optional[Dict] = None,
+        keep_alive: Optional[str] = None
+    ) -> Dict:
         """
         Use chat endpoint for multi-turn conversations.
 
         Args:
             messages: List of message dictionaries with 'role' and 'content'
+            options: Model options (temperature, num_keep, ...)
+            keep_alive: How long Ollama keeps the model (and its cache) loaded
 
         Returns:
             Dictionary with response
@@ -245,17 +424,21 @@ Your Socratic response:"""
                 "messages": messages,
                 "stream": False
             }
+            if options:
+                payload["options"] = options
+            if keep_alive:
+                payload["keep_alive"] = keep_alive
 
-            response = requests.post(self.chat_url, json=payload, timeout=60)
+            response = self.session.post(self.chat_url, json=payload, timeout=60)
             response.raise_for_status()
 
-            result = response.json()
+            result = _loads(response.content)
             return {
                 "response": result.get("message", {}).get("content", "").strip(),
                 "done": result.get("done", False)
             }
 
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, ValueError) as e:
             return {
                 "response": f"Error: {str(e)}",
                 "error": True
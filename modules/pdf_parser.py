@@ -3,21 +3,60 @@ PDF Parser Module
 Extracts the first 500 words from a PDF file for context initialization.
 """
 
-import PyPDF2
-from typing import Optional
+import functools
+import hashlib
+import os
+from typing import BinaryIO, Optional, Union
+
+
+PDFSource = Union[str, os.PathLike, BinaryIO]
+
+# Extracted text survives restarts here
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "wrtvoice", "pdf")
+
+
+def _pdf_reader_class():
+    """Import the PDF library on first use (pypdf, or PyPDF2 if that's all there is)."""
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        from PyPDF2 import PdfReader
+    return PdfReader
 
 
 class PDFParser:
     """Extracts text content from PDF files."""
 
+    # Rough words per page, used to bound how many pages are parsed
+    WORDS_PER_PAGE = 250
+
     @staticmethod
-    def extract_first_n_words(pdf_path: str, n_words: int = 500) -> str:
+    def _read(pdf_source: PDFSource, func):
+        """Open a PDF from a path or binary file object and apply func to its reader."""
+        PdfReader = _pdf_reader_class()
+
+        if isinstance(pdf_source, (str, os.PathLike)):
+            with open(pdf_source, 'rb') as file:
+                return func(PdfReader(file))
+
+        # In-memory upload (e.g. io.BytesIO) - no temp file needed
+        pdf_source.seek(0)
+        return func(PdfReader(pdf_source))
+
+    @staticmethod
+    def extract_first_n_words(
+        pdf_path: PDFSource,
+        n_words: int = 500,
+        max_pages: Optional[int] = None
+    ) -> str:
         """
         Extract the first N words from a PDF file.
 
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path to the PDF file, or a binary file object
             n_words: Number of words to extract (default: 500)
+            max_pages: Maximum number of pages to parse
+                (default: n_words // WORDS_PER_PAGE + 1)
 
         Returns:
             String containing the first N words
@@ -26,30 +65,18 @@ class PDFParser:
             FileNotFoundError: If PDF file doesn't exist
             Exception: If PDF cannot be read
         """
-        try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-
-                # Extract text from all pages until we have enough words
-                all_text = []
-                word_count = 0
+        if max_pages is None:
+            max_pages = n_words // PDFParser.WORDS_PER_PAGE + 1
 
-                for page_num in range(len(pdf_reader.pages)):
-                    page = pdf_reader.pages[page_num]
-                    text = page.extract_text()
-
-                    # Split into words and accumulate
-                    words = text.split()
-                    for word in words:
-                        if word_count >= n_words:
-                            break
-                        all_text.append(word)
-                        word_count += 1
-
-                    if word_count >= n_words:
-                        break
+        try:
+            file_key = PDFParser._file_key(pdf_path)
+            if file_key is None:
+                return PDFParser._read(
+                    pdf_path, lambda pdf_reader: PDFParser._extract_words(pdf_reader, n_words, max_pages)
+                )
 
-                return ' '.join(all_text)
+            # Same file, unchanged since last parse: reuse the result
+            return PDFParser._extract_cached(file_key + (n_words, max_pages))
 
         except FileNotFoundError:
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
@@ -57,26 +84,113 @@ class PDFParser:
             raise Exception(f"Error reading PDF: {str(e)}")
 
     @staticmethod
-    def get_metadata(pdf_path: str) -> dict:
+    def _extract_words(pdf_reader, n_words: int, max_pages: int) -> str:
+        """Extract text page by page until we have enough words."""
+        all_text = []
+        word_count = 0
+
+        for page_num in range(min(len(pdf_reader.pages), max_pages)):
+            page = pdf_reader.pages[page_num]
+            words = page.extract_text().split()
+
+            # Take only the words still needed
+            need = n_words - word_count
+            all_text.extend(words[:need])
+            word_count += min(len(words), need)
+
+            if word_count >= n_words:
+                break
+
+        return ' '.join(all_text)
+
+    @staticmethod
+    def _file_key(pdf_source: PDFSource) -> Optional[tuple]:
+        """
+        Cache key for a PDF on disk.
+
+        Args:
+            pdf_source: Path to the PDF file, or a binary file object
+
+        Returns:
+            (absolute path, mtime, size), or None for file objects
+        """
+        if not isinstance(pdf_source, (str, os.PathLike)):
+            return None
+
+        path = os.path.abspath(pdf_source)
+        stat = os.stat(path)
+        return (path, stat.st_mtime, stat.st_size)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _extract_cached(key: tuple) -> str:
+        """
+        Extract words for a (path, mtime, size, n_words, max_pages) key.
+
+        A changed file gets a new key, so stale entries are never returned.
+        """
+        path, _, _, n_words, max_pages = key
+        cache_file = os.path.join(
+            CACHE_DIR, hashlib.sha1(repr(key).encode('utf-8')).hexdigest() + ".txt"
+        )
+
+        try:
+            with open(cache_file, 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            pass
+
+        text = PDFParser._read(
+            path, lambda pdf_reader: PDFParser._extract_words(pdf_reader, n_words, max_pages)
+        )
+
+        # Best effort: a read-only home directory just means no disk cache
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp_file, cache_file)
+        except OSError:
+            pass
+
+        return text
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _metadata_cached(file_key: tuple) -> dict:
+        """Read metadata for a (path, mtime, size) key."""
+        return PDFParser._read(file_key[0], PDFParser._metadata_of)
+
+    @staticmethod
+    def _metadata_of(pdf_reader) -> dict:
+        """Build the metadata dictionary from an open reader."""
+        metadata = pdf_reader.metadata
+
+        return {
+            'title': metadata.get('/Title', 'Unknown') if metadata else 'Unknown',
+            'author': metadata.get('/Author', 'Unknown') if metadata else 'Unknown',
+            'pages': len(pdf_reader.pages)
+        }
+
+    @staticmethod
+    def get_metadata(pdf_path: PDFSource) -> dict:
         """
         Extract metadata from PDF.
 
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path to the PDF file, or a binary file object
 
         Returns:
             Dictionary containing PDF metadata
         """
         try:
-            with open(pdf_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata = pdf_reader.metadata
-
-                return {
-                    'title': metadata.get('/Title', 'Unknown') if metadata else 'Unknown',
-                    'author': metadata.get('/Author', 'Unknown') if metadata else 'Unknown',
-                    'pages': len(pdf_reader.pages)
-                }
+            file_key = PDFParser._file_key(pdf_path)
+            if file_key is None:
+                return PDFParser._read(pdf_path, PDFParser._metadata_of)
+
+            # Copy so callers can't modify the cached entry
+            return dict(PDFParser._metadata_cached(file_key))
         except Exception as e:
             return {'error': str(e)}
 
@@ -3,13 +3,87 @@ Text-to-Speech Engine Module
 Handles converting bot responses to speech audio.
 """
 
-import pyttsx3
+import json
 import os
-from typing import Optional
+import queue
+import re
+import subprocess
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
 import threading
 
+import numpy as np
 
-class TTSEngine:
+
+class BaseTTSEngine(ABC):
+    """Sentence-level streaming shared by the TTS backends; subclasses implement speak()."""
+
+    # Sentence boundary: terminal punctuation followed by whitespace
+    SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+    def __init__(self):
+        # Streamed text not yet ending in a complete sentence
+        self._pending_text = ""
+
+    @abstractmethod
+    def speak(self, text: str, blocking: bool = True) -> None:
+        """
+        Speak text aloud.
+
+        Args:
+            text: Text to speak
+            blocking: Whether to block until speech completes
+        """
+
+    def speak_async(self, text: str) -> None:
+        """
+        Speak text asynchronously (non-blocking).
+
+        Args:
+            text: Text to speak
+        """
+        self.speak(text, blocking=False)
+
+    @classmethod
+    def split_sentences(cls, text: str) -> List[str]:
+        """
+        Split text into sentences.
+
+        Args:
+            text: Text to split
+
+        Returns:
+            Non-empty sentences
+        """
+        return [sentence.strip() for sentence in cls.SENTENCE_END.split(text) if sentence.strip()]
+
+    def feed(self, chunk: str) -> None:
+        """
+        Speak streamed text sentence by sentence as it arrives.
+
+        Complete sentences are spoken immediately (non-blocking); the
+        unfinished tail is kept until more text or flush().
+
+        Args:
+            chunk: Next piece of streamed text (e.g. LLM tokens)
+        """
+        self._pending_text += chunk
+        parts = self.SENTENCE_END.split(self._pending_text)
+        self._pending_text = parts.pop()
+
+        for sentence in parts:
+            if sentence.strip():
+                self.speak_async(sentence.strip())
+
+    def flush(self) -> None:
+        """Speak whatever streamed text is left (end of the response)."""
+        text = self._pending_text.strip()
+        self._pending_text = ""
+        if text:
+            self.speak_async(text)
+
+
+class TTSEngine(BaseTTSEngine):
     """Text-to-speech engine using pyttsx3 (offline)."""
 
     def __init__(self, rate: int = 150, volume: float = 0.9, voice_index: int = 0):
@@ -21,6 +95,9 @@ class TTSEngine:
             volume: Volume level (0.0 to 1.0)
             voice_index: Voice index to use (0 for default)
         """
+        import pyttsx3
+
+        super().__init__()
         self.engine = pyttsx3.init()
         self.engine.setProperty('rate', rate)
         self.engine.setProperty('volume', volume)
@@ -30,42 +107,43 @@ class TTSEngine:
         if voice_index < len(voices):
             self.engine.setProperty('voice', voices[voice_index].id)
 
-        self.is_speaking = False
-        self._lock = threading.Lock()
+        # pyttsx3 is not thread-safe: a single worker runs every engine job in order
+        self._tts_queue: queue.Queue = queue.Queue()
+        threading.Thread(target=self._tts_worker, daemon=True).start()
+
+    def _tts_worker(self) -> None:
+        """Run queued engine jobs one at a time."""
+        while True:
+            job = self._tts_queue.get()
+            try:
+                job()
+            except Exception as e:
+                print(f"TTS error: {e}")
+            finally:
+                self._tts_queue.task_done()
+
+    def _enqueue(self, job: Callable[[], None], blocking: bool) -> None:
+        """Queue an engine job, optionally waiting for the queue to drain."""
+        self._tts_queue.put(job)
+        if blocking:
+            self._tts_queue.join()
+
+    def _say(self, text: str) -> None:
+        """Speak text on the worker thread."""
+        self.engine.say(text)
+        self.engine.runAndWait()
 
     def speak(self, text: str, blocking: bool = True) -> None:
         """
         Speak text aloud.
 
-        Args:
-            text: Text to speak
-            blocking: Whether to block until speech completes
-        """
-        with self._lock:
-            if self.is_speaking:
-                self.engine.stop()
-
-            self.is_speaking = True
-
-        try:
-            self.engine.say(text)
-            if blocking:
-                self.engine.runAndWait()
-            else:
-                # Run in separate thread
-                threading.Thread(target=self.engine.runAndWait, daemon=True).start()
-        finally:
-            with self._lock:
-                self.is_speaking = False
-
-    def speak_async(self, text: str) -> None:
-        """
-        Speak text asynchronously (non-blocking).
+        Calls are queued and spoken in order.
 
         Args:
             text: Text to speak
+            blocking: Whether to block until speech completes
         """
-        self.speak(text, blocking=False)
+        self._enqueue(lambda: self._say(text), blocking)
 
     def save_to_file(self, text: str, output_path: str) -> bool:
         """
@@ -78,19 +156,31 @@ class TTSEngine:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        result = {"ok": False}
 
-            self.engine.save_to_file(text, output_path)
-            self.engine.runAndWait()
-            return True
-        except Exception as e:
-            print(f"Error saving TTS to file: {e}")
-            return False
+        def save() -> None:
+            try:
+                # Ensure directory exists
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+                self.engine.save_to_file(text, output_path)
+                self.engine.runAndWait()
+                result["ok"] = True
+            except Exception as e:
+                print(f"Error saving TTS to file: {e}")
+
+        self._enqueue(save, blocking=True)
+        return result["ok"]
 
     def stop(self) -> None:
-        """Stop current speech."""
+        """Stop current speech and drop anything still queued."""
+        while True:
+            try:
+                self._tts_queue.get_nowait()
+            except queue.Empty:
+                break
+            self._tts_queue.task_done()
+
         self.engine.stop()
 
     def list_voices(self) -> list:
@@ -144,6 +234,215 @@ class TTSEngine:
         self.engine.setProperty('volume', max(0.0, min(1.0, volume)))
 
 
+class PiperTTSEngine(BaseTTSEngine):
+    """
+    Streaming text-to-speech using the Piper CLI (neural, offline).
+
+    One piper process is kept running; each sentence is written to its stdin
+    and the raw PCM it produces is played as it arrives, so speech starts
+    while later sentences are still being synthesized (or generated).
+    """
+
+    def __init__(
+        self,
+        model_path: str,
+        rate: int = 150,
+        volume: float = 0.9,
+        piper_cmd: str = "piper"
+    ):
+        """
+        Start the Piper process and audio output stream.
+
+        Args:
+            model_path: Path to the Piper voice model (.onnx)
+            rate: Speech rate (words per minute, 150 = the voice's natural speed)
+            volume: Volume level (0.0 to 1.0)
+            piper_cmd: Piper executable
+        """
+        try:
+            import sounddevice
+        except ImportError:
+            raise ImportError("PiperTTSEngine requires sounddevice: pip install sounddevice")
+
+        super().__init__()
+        self.model_path = model_path
+        self.piper_cmd = piper_cmd
+        self.rate = rate
+        self.volume = max(0.0, min(1.0, volume))
+        self._lock = threading.Lock()  # Serializes writes to piper's stdin
+        self._stream_lock = threading.Lock()  # Guards the audio stream across restarts
+        self._generation = 0  # Bumped on restart; stale output threads exit
+
+        # Sample rate comes from the voice's config (model.onnx.json)
+        self.sample_rate = 22050
+        try:
+            with open(f"{model_path}.json", 'r', encoding='utf-8') as f:
+                self.sample_rate = json.load(f)["audio"]["sample_rate"]
+        except (OSError, KeyError, ValueError):
+            pass
+
+        self._stream = sounddevice.RawOutputStream(samplerate=self.sample_rate, channels=1, dtype='int16')
+        self._stream.start()
+
+        self.process: Optional[subprocess.Popen] = None
+        self._start_process()
+
+    def _start_process(self) -> None:
+        """Launch piper and the thread that plays its output."""
+        self.process = subprocess.Popen(
+            [
+                self.piper_cmd,
+                "--model", self.model_path,
+                "--output-raw",
+                "--length_scale", str(150 / max(1, self.rate))
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        threading.Thread(
+            target=self._play_output, args=(self.process, self._generation), daemon=True
+        ).start()
+
+    def _play_output(self, process: subprocess.Popen, generation: int) -> None:
+        """Copy raw PCM from piper to the audio device until piper exits or is replaced."""
+        while True:
+            data = process.stdout.read1(4096)
+            if not data:
+                return
+            if len(data) % 2:
+                data += process.stdout.read(1)
+            if self.volume < 1.0:
+                samples = np.frombuffer(data, dtype=np.int16) * self.volume
+                data = samples.astype(np.int16).tobytes()
+
+            with self._stream_lock:
+                # Output from a process stop() replaced is dropped
+                if generation != self._generation:
+                    return
+                self._stream.write(data)
+
+    def speak(self, text: str, blocking: bool = True) -> None:
+        """
+        Queue text for synthesis, one line per sentence.
+
+        Piper streams continuously, so this returns as soon as the text has
+        been handed over; ``blocking`` is accepted for API compatibility.
+
+        Args:
+            text: Text to speak
+            blocking: Ignored (see above)
+        """
+        lines = "".join(
+            sentence.replace("\n", " ") + "\n" for sentence in self.split_sentences(text)
+        )
+        if not lines:
+            return
+
+        with self._lock:
+            self.process.stdin.write(lines.encode('utf-8'))
+            self.process.stdin.flush()
+
+    def save_to_file(self, text: str, output_path: str) -> bool:
+        """
+        Save speech to a WAV file (separate one-shot piper run).
+
+        Args:
+            text: Text to convert
+            output_path: Path to save audio file
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+            subprocess.run(
+                [self.piper_cmd, "--model", self.model_path, "--output_file", output_path],
+                input=text.encode('utf-8'),
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                check=True
+            )
+            return True
+        except (OSError, subprocess.CalledProcessError) as e:
+            print(f"Error saving TTS to file: {e}")
+            return False
+
+    def stop(self) -> None:
+        """Stop current speech (drops queued sentences and restarts piper)."""
+        self._pending_text = ""
+        with self._lock:
+            with self._stream_lock:
+                # Retire the current output thread before touching the stream
+                self._generation += 1
+                self.process.kill()
+                self._stream.abort()
+                self._stream.start()
+            self.process.wait()
+            self._start_process()
+
+    def close(self) -> None:
+        """Shut down piper and the audio stream (drops any unplayed speech)."""
+        with self._lock:
+            with self._stream_lock:
+                # Retire the output thread so nothing writes to the closed stream
+                self._generation += 1
+            # Kill rather than drain: nobody reads piper's stdout any more
+            self.process.kill()
+            self.process.stdin.close()
+            self.process.wait()
+        self._stream.close()
+
+    def list_voices(self) -> list:
+        """
+        List available voices.
+
+        Returns:
+            The loaded Piper model (one voice per model)
+        """
+        return [(0, os.path.basename(self.model_path), [])]
+
+    def set_voice(self, voice_index: int) -> bool:
+        """Piper voices are separate models; create a new engine to switch."""
+        return voice_index == 0
+
+    def set_rate(self, rate: int) -> None:
+        """
+        Set speech rate (restarts piper with a new length scale).
+
+        Args:
+            rate: Words per minute (typical range: 100-250)
+        """
+        self.rate = rate
+        self.stop()
+
+    def set_volume(self, volume: float) -> None:
+        """
+        Set volume level.
+
+        Args:
+            volume: Volume (0.0 to 1.0)
+        """
+        self.volume = max(0.0, min(1.0, volume))
+
+
+def create_tts_engine(backend: str = "pyttsx3", **kwargs) -> BaseTTSEngine:
+    """
+    Create a TTS engine for the given backend.
+
+    Args:
+        backend: "pyttsx3" (system voices) or "piper" (streaming neural voices)
+        **kwargs: Engine arguments (piper requires model_path)
+
+    Returns:
+        TTS engine instance
+    """
+    if backend == "piper":
+        return PiperTTSEngine(**kwargs)
+    return TTSEngine(**kwargs)
+
+
 if __name__ == "__main__":
     # Test the TTS engine
     print("Initializing TTS engine...")
@@ -4,20 +4,51 @@ Refactored from transcribe_demo.py for use in web application.
 Real-time transcription with phrase detection and splitting.
 """
 
+import asyncio
+import logging
+import os
 import numpy as np
 import speech_recognition as sr
 import whisper
 import torch
+from collections import deque
 from datetime import datetime, timedelta, timezone
-from queue import Queue
-from typing import Optional, Callable, Dict
+from enum import IntEnum
+from queue import Empty, Queue
+from typing import Optional, Callable, NamedTuple
 from sys import platform
 import threading
 
+logger = logging.getLogger(__name__)
+
+
+class ResultKind(IntEnum):
+    """Kind of transcription result returned by process_audio_queue()."""
+    PAUSING = 0  # User stopped talking, countdown running
+    FINAL = 1    # Phrase complete (timeout reached)
+    PARTIAL = 2  # Live transcription while the user is speaking
+
+
+class STTResult(NamedTuple):
+    """Transcription result."""
+    kind: ResultKind
+    text: str
+    timestamp: datetime
+    time_remaining: float
+
 
 class WhisperSTT:
     """Real-time speech-to-text using Whisper model."""
 
+    # Minimum new audio (0.8 s of 16 kHz mono int16) before a partial decode
+    MIN_PARTIAL_BYTES = int(16000 * 2 * 0.8)
+
+    # CPU inference threads; leaves cores for the recorder and listener threads
+    CPU_THREADS = max(1, (os.cpu_count() or 2) // 2)
+
+    # torch's thread pool is process-wide, so it is capped once for all sessions
+    _torch_threads_capped = False
+
     def __init__(
         self,
         model: str = "base",
@@ -26,7 +57,11 @@ class WhisperSTT:
         record_timeout: float = 2,
         phrase_timeout: float = 5.0,  # Default 5 seconds
         device_index: Optional[int] = None,
-        debug: bool = False
+        debug: bool = False,
+        backend: str = "openai",
+        beam_size: int = 1,
+        vad_filter: bool = False,
+        compute_type: Optional[str] = None
     ):
         """
         Initialize Whisper STT engine.
@@ -39,6 +74,12 @@ class WhisperSTT:
             phrase_timeout: Silence duration before new phrase (seconds)
             device_index: Microphone device index (None for default)
             debug: Enable debug logging
+            backend: "openai" (openai-whisper, float weights) or "faster"
+                (faster-whisper / CTranslate2, the only int8 backend)
+            beam_size: Beam size for the faster backend (1 = greedy)
+            vad_filter: Skip silence with Silero VAD (faster backend only)
+            compute_type: CTranslate2 compute type for the faster backend
+                (None = int8_float16 on CUDA, int8 on CPU)
         """
         self.model_name = model
         self.non_english = non_english
@@ -47,25 +88,78 @@ class WhisperSTT:
         self.phrase_timeout = phrase_timeout
         self.device_index = device_index
         self.debug = debug
+        self.beam_size = beam_size
+        self.vad_filter = vad_filter
 
         # Initialize components
         self.data_queue = Queue()
-        self.phrase_bytes = bytes()
+        self.phrase_bytes = bytearray()
         self.phrase_time = None  # Last time we received audio
+        self._decoded_offset_bytes = 0  # End of the audio already transcribed
+        self._float_audio = np.empty(0, dtype=np.float32)  # Phrase as float32 (grows in place)
+        self._float_cursor_bytes = 0  # End of the audio already converted to float
+        self._decoded_text = ""  # Running transcript of the decoded audio
+        self._last_partial_text = ""  # Last partial transcript returned
+        self._decode_in_flight = False  # Drops overlapping partial decodes
+        self._phrase_id = 0  # Tags inference jobs so stale partials are dropped
+        self._pending_jobs = 0  # Jobs submitted but not yet collected
+        self._final_pending = False  # Final pass submitted, result not yet returned
+        self._finals: deque = deque()  # Finished final passes, (phrase_id, text) in order
         self.is_running = False
         self.listener_thread = None
 
+        # Event loop notified by the recorder thread when audio arrives
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._audio_ready: Optional[asyncio.Event] = None
+
+        # Same signal for synchronous callers (wait_and_process)
+        self._audio_event = threading.Event()
+
         # Callbacks
         self.on_transcription: Optional[Callable] = None
         self.on_phrase_complete: Optional[Callable] = None
 
         # Load Whisper model
-        print(f"Loading Whisper model '{model}'...")
+        logger.info("Loading Whisper model '%s'...", model)
         model_name = model
         if model != "large" and not non_english:
             model_name = model + ".en"
-        self.audio_model = whisper.load_model(model_name)
-        print("Model loaded successfully.")
+
+        if backend == "faster":
+            try:
+                from faster_whisper import WhisperModel
+            except ImportError:
+                logger.warning("faster-whisper is not installed; falling back to openai-whisper")
+                backend = "openai"
+
+        self.backend = backend
+        # Pin the model to the best device at load time so weights don't move between calls
+        self.device = self._best_device(allow_mps=backend != "faster")
+
+        if backend == "faster":
+            if compute_type is None:
+                compute_type = "int8_float16" if self.device == "cuda" else "int8"
+            # CTranslate2 has its own thread pool (0 = its default)
+            cpu_threads = self.CPU_THREADS if self.device == "cpu" else 0
+            self.audio_model = WhisperModel(
+                model_name, device=self.device, compute_type=compute_type, cpu_threads=cpu_threads
+            )
+        else:
+            try:
+                self.audio_model = whisper.load_model(model_name, device=self.device)
+            except Exception as e:
+                if self.device != "mps":
+                    raise
+                # Some torch/whisper versions can't place every buffer on MPS
+                logger.warning("Loading on MPS failed, using CPU: %s", e)
+                self.device = "cpu"
+                self.audio_model = whisper.load_model(model_name, device=self.device)
+            if self.device == "cpu" and not WhisperSTT._torch_threads_capped:
+                torch.set_num_threads(self.CPU_THREADS)
+                WhisperSTT._torch_threads_capped = True
+        # Half precision only pays off (and only works reliably) on CUDA
+        self._use_fp16 = self.device == "cuda"
+        logger.info("Model loaded successfully (%s backend on %s).", self.backend, self.device)
 
         # Initialize speech recognizer
         self.recorder = sr.Recognizer()
@@ -75,6 +169,107 @@ class WhisperSTT:
         # Initialize microphone
         self.source = self._initialize_microphone()
 
+        # Inference worker: transcribe off the caller's thread
+        self._infer_in = Queue()
+        self._infer_out = Queue()
+        self._infer_thread = threading.Thread(target=self._infer_loop, daemon=True)
+        self._infer_thread.start()
+
+    @staticmethod
+    def _best_device(allow_mps: bool = True) -> str:
+        """
+        Pick the fastest available torch device.
+
+        Args:
+            allow_mps: Consider Apple Silicon (MPS) when CUDA is unavailable
+
+        Returns:
+            "cuda", "mps" or "cpu"
+        """
+        if torch.cuda.is_available():
+            return "cuda"
+        mps = getattr(torch.backends, "mps", None)
+        if allow_mps and mps is not None and mps.is_available():
+            return "mps"
+        return "cpu"
+
+    def _transcribe(
+        self,
+        audio_np: np.ndarray,
+        initial_prompt: Optional[str] = None,
+        vad_filter: Optional[bool] = None
+    ) -> str:
+        """
+        Transcribe float32 audio with the configured backend.
+
+        Args:
+            audio_np: Mono 16 kHz audio samples in [-1, 1]
+            initial_prompt: Preceding transcript to condition the decoder on
+            vad_filter: Override the configured VAD setting (faster backend)
+
+        Returns:
+            Transcribed text
+        """
+        if self.backend == "faster":
+            segments, _ = self.audio_model.transcribe(
+                audio_np,
+                beam_size=self.beam_size,
+                vad_filter=self.vad_filter if vad_filter is None else vad_filter,
+                condition_on_previous_text=False,
+                initial_prompt=initial_prompt
+            )
+            return "".join(segment.text for segment in segments).strip()
+
+        return self.audio_model.transcribe(
+            audio_np,
+            fp16=self._use_fp16,
+            condition_on_previous_text=False,
+            initial_prompt=initial_prompt
+        )['text'].strip()
+
+    def _is_silent(self, audio_bytes: bytes) -> bool:
+        """
+        Cheap energy gate on 16-bit PCM (no float conversion).
+
+        Args:
+            audio_bytes: Raw int16 audio
+
+        Returns:
+            True if the RMS energy is below half the calibrated mic energy threshold
+        """
+        samples = np.frombuffer(audio_bytes, dtype=np.int16).astype(np.int32)
+        if not samples.size:
+            return True
+        rms = np.sqrt(np.mean(samples * samples))
+        # adjust_for_ambient_noise() recalibrates the recognizer's threshold
+        return rms < self.recorder.energy_threshold * 0.5
+
+    def _convert_new_audio(self) -> None:
+        """Convert only the audio added since the last call and append it to the float buffer."""
+        start = self._float_cursor_bytes // 2
+        tail = np.frombuffer(self.phrase_bytes, dtype=np.int16, offset=self._float_cursor_bytes)
+        end = start + len(tail)
+
+        # Grow geometrically so appends stay amortized O(1)
+        if end > len(self._float_audio):
+            grown = np.empty(max(end, 2 * len(self._float_audio)), dtype=np.float32)
+            grown[:start] = self._float_audio[:start]
+            self._float_audio = grown
+
+        np.multiply(tail, 1 / 32768.0, out=self._float_audio[start:end], casting='unsafe')
+        self._float_cursor_bytes = len(self.phrase_bytes)
+        # Release the buffer export so phrase_bytes can keep growing
+        del tail
+
+    def _float_slice(self, start_bytes: int, end_bytes: int) -> np.ndarray:
+        """Float32 samples for a byte range of the phrase (a view, no conversion)."""
+        return self._float_audio[start_bytes // 2:end_bytes // 2]
+
+    def warmup(self) -> None:
+        """Run one second of silence through the model so the first utterance skips cold start."""
+        # Without VAD: the filter would drop the silence and the model would never run
+        self._transcribe(np.zeros(16000, dtype=np.float32), vad_filter=False)
+
     def _initialize_microphone(self) -> sr.Microphone:
         """Initialize microphone source."""
         if self.device_index is not None:
@@ -97,13 +292,34 @@ class WhisperSTT:
         """
         data = audio.get_raw_data()
         self.data_queue.put(data)
+        self._notify()
+
+    def _notify(self) -> None:
+        """Wake up any caller waiting in wait_and_process() or wait_for_audio() (thread-safe)."""
+        self._audio_event.set()
+
+        loop = self._loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._audio_ready.set)
+            except RuntimeError:
+                # Event loop already closed
+                pass
 
     def start_listening(self) -> None:
         """Start background listening thread."""
         if self.is_running:
-            print("Already listening.")
+            logger.info("Already listening.")
             return
 
+        # Bind to the running event loop (if any) for wait_for_audio()
+        try:
+            self._loop = asyncio.get_running_loop()
+            self._audio_ready = asyncio.Event()
+        except RuntimeError:
+            self._loop = None
+            self._audio_ready = None
+
         # Start background listener
         self.recorder.listen_in_background(
             self.source,
@@ -112,63 +328,224 @@ class WhisperSTT:
         )
 
         self.is_running = True
-        print("Started listening...")
+        logger.info("Started listening...")
 
     def stop_listening(self) -> None:
         """Stop background listening."""
         self.is_running = False
-        print("Stopped listening.")
+        self._loop = None
+        logger.info("Stopped listening.")
+
+    def shutdown(self) -> None:
+        """Stop listening and the inference worker."""
+        self.stop_listening()
+        self._infer_in.put(None)
+
+    def _infer_loop(self) -> None:
+        """Worker thread: transcribe queued audio until shutdown() is called."""
+        while True:
+            job = self._infer_in.get()
+            if job is None:
+                return
+
+            phrase_id, is_final, audio_np, initial_prompt = job
+            try:
+                text = self._transcribe(audio_np, initial_prompt=initial_prompt)
+            except Exception as e:
+                logger.error("Transcription failed: %s", e)
+                text = ""
+
+            self._infer_out.put((phrase_id, is_final, text))
+            self._notify()
 
-    def process_audio_queue(self) -> Optional[Dict]:
+    def _collect_inference(self, timeout: float = 0) -> None:
+        """
+        Apply finished inference results to the phrase state.
+
+        Args:
+            timeout: How long to block for the first result (0 = don't block)
+        """
+        while self._pending_jobs:
+            try:
+                if timeout:
+                    phrase_id, is_final, text = self._infer_out.get(True, timeout)
+                    timeout = 0
+                else:
+                    phrase_id, is_final, text = self._infer_out.get_nowait()
+            except Empty:
+                return
+
+            self._pending_jobs -= 1
+            if is_final:
+                self._finals.append((phrase_id, text))
+            elif phrase_id == self._phrase_id:
+                self._decode_in_flight = False
+                if text:
+                    self._decoded_text = f"{self._decoded_text} {text}".strip()
+
+    def _submit(self, is_final: bool, audio_np: np.ndarray, initial_prompt: Optional[str] = None) -> None:
+        """Queue float32 audio for the inference worker."""
+        self._pending_jobs += 1
+        self._infer_in.put((self._phrase_id, is_final, audio_np, initial_prompt))
+
+    @property
+    def phrase_pending(self) -> bool:
+        """True while audio has been accumulated for an unfinished phrase."""
+        return bool(self.phrase_bytes) or self._final_pending
+
+    async def wait_for_audio(self, timeout: float) -> bool:
+        """
+        Wait until new audio arrives from the recorder thread.
+
+        Args:
+            timeout: Maximum time to wait (seconds)
+
+        Returns:
+            True if woken by new audio, False on timeout
+        """
+        if self._audio_ready is None:
+            await asyncio.sleep(timeout)
+            return False
+
+        try:
+            await asyncio.wait_for(self._audio_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+
+        self._audio_ready.clear()
+        return True
+
+    def wait_and_process(self, timeout: Optional[float] = None) -> Optional[STTResult]:
+        """
+        Block until there is something to process, then process it.
+
+        Wakes on new audio, on a finished decode, or when the pending
+        phrase's timeout expires - never on a fixed polling interval.
+
+        Args:
+            timeout: Maximum time to wait (seconds, default 5)
+
+        Returns:
+            STTResult with transcription info or None if no activity
+        """
+        wait = 5.0 if timeout is None else timeout
+        if self.phrase_time is not None:
+            elapsed = (datetime.now(timezone.utc) - self.phrase_time).total_seconds()
+            wait = min(wait, max(0.0, self.phrase_timeout - elapsed))
+
+        self._audio_event.wait(wait)
+        self._audio_event.clear()
+        return self.process_audio_queue()
+
+    async def process_audio_queue_async(self) -> Optional[STTResult]:
+        """
+        Async variant of process_audio_queue().
+
+        Briefly waits (in an executor) for a running decode to finish so its
+        result is returned on this call rather than the next one.
+
+        Returns:
+            STTResult with transcription info or None if no activity
+        """
+        if self._pending_jobs and self._infer_out.empty():
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self._collect_inference, 0.05)
+        return self.process_audio_queue()
+
+    def process_audio_queue(self) -> Optional[STTResult]:
         """
         Process audio from queue and return transcription.
 
+        Never blocks on the model: decodes run on the inference worker and
+        their results are picked up on later calls.
+
         Logic:
-        1. Process any new audio first
-        2. If we have accumulated audio and user stopped (no new audio), start countdown
-        3. Countdown starts from FULL timeout value when user stops
-        4. If countdown reaches 0, finalize phrase
+        1. Return a finished final transcription (new audio waits until it has been returned)
+        2. Process any new audio, queueing a partial decode
+        3. If we have accumulated audio and user stopped (no new audio), start countdown
+        4. Countdown starts from FULL timeout value when user stops
+        5. If countdown reaches 0, queue the final decode
 
         Returns:
-            Dictionary with transcription info or None if no activity
+            STTResult with transcription info or None if no activity
         """
         now = datetime.now(timezone.utc)
 
-        # FIRST: Check if new audio is available
-        has_new_audio = not self.data_queue.empty()
+        self._collect_inference()
 
-        if has_new_audio:
-            # Get new audio from queue
-            audio_data = b''.join(self.data_queue.queue)
-            self.data_queue.queue.clear()
+        # FIRST: Final pass finished - phrase complete
+        if self._finals:
+            _, final_text = self._finals.popleft()
+            self._final_pending = bool(self._finals)
 
+            if self.debug:
+                logger.debug("✓ Phrase complete! '%s...'", final_text[:50])
+
+            result = STTResult(ResultKind.FINAL, final_text, now, 0)
+
+            if self.on_phrase_complete and final_text:
+                self.on_phrase_complete(result)
+
+            return result
+
+        # Hold new audio in the queue until the previous phrase's FINAL has been
+        # returned, so the next phrase's results can't overtake it
+        if self._final_pending:
+            return None
+
+        # SECOND: Drain new audio from the queue into the phrase buffer
+        has_new_audio = False
+        while True:
+            try:
+                self.phrase_bytes.extend(self.data_queue.get_nowait())
+            except Empty:
+                break
+            has_new_audio = True
+
+        if has_new_audio:
             # Update timestamp - marks when we LAST received audio
             self.phrase_time = now
 
-            # Accumulate audio
-            self.phrase_bytes += audio_data
-
-            # Transcribe current accumulated audio
-            audio_np = np.frombuffer(self.phrase_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-            text = self.audio_model.transcribe(audio_np, fp16=torch.cuda.is_available())['text'].strip()
+            # Convert just the new samples (the full phrase is never reconverted)
+            self._convert_new_audio()
+
+            # Interim text only feeds the status line: skip the model until
+            # enough new audio has accumulated or while a decode is running
+            new_bytes = len(self.phrase_bytes) - self._decoded_offset_bytes
+            if new_bytes >= self.MIN_PARTIAL_BYTES and not self._decode_in_flight:
+                tail = self.phrase_bytes[self._decoded_offset_bytes:]
+                if self._is_silent(tail):
+                    # Room noise only: nothing new to transcribe
+                    self._decoded_offset_bytes = len(self.phrase_bytes)
+                    if self.debug:
+                        logger.debug("Skipping decode of silent audio.")
+                else:
+                    # Decode only the audio added since the last decode,
+                    # conditioned on the tail of the running transcript
+                    self._decode_in_flight = True
+                    self._submit(
+                        False,
+                        self._float_slice(self._decoded_offset_bytes, len(self.phrase_bytes)),
+                        self._decoded_text[-200:] or None
+                    )
+                    self._decoded_offset_bytes = len(self.phrase_bytes)
 
             if self.debug:
-                print(f"[DEBUG] New audio received, transcribed: '{text[:50]}...'")
+                logger.debug("New audio received, transcript so far: '%s...'", self._decoded_text[:50])
+
+        # Report the running transcript while the user speaks or when a decode lands
+        if self._decoded_text != self._last_partial_text or has_new_audio:
+            self._last_partial_text = self._decoded_text
 
-            result = {
-                'text': text,
-                'phrase_complete': False,
-                'pausing': False,
-                'time_remaining': self.phrase_timeout,  # Full timeout available
-                'timestamp': now
-            }
+            # Full timeout available
+            result = STTResult(ResultKind.PARTIAL, self._decoded_text, now, self.phrase_timeout)
 
             if self.on_transcription:
                 self.on_transcription(result)
 
             return result
 
-        # SECOND: No new audio - check if we have accumulated audio (user stopped talking)
+        # THIRD: No new audio - check if we have accumulated audio (user stopped talking)
         if not self.phrase_time or not self.phrase_bytes:
             # No accumulated audio yet, nothing to do
             return None
@@ -178,43 +555,35 @@ class WhisperSTT:
         time_remaining = self.phrase_timeout - time_since_stopped
 
         if self.debug:
-            print(f"[DEBUG] Silence: {time_since_stopped:.2f}s / {self.phrase_timeout}s, remaining: {time_remaining:.2f}s")
+            logger.debug("Silence: %.2fs / %ss, remaining: %.2fs", time_since_stopped, self.phrase_timeout, time_remaining)
 
-        # THIRD: Check if countdown finished (timeout reached)
+        # FOURTH: Check if countdown finished (timeout reached)
         if time_since_stopped >= self.phrase_timeout:
             if self.debug:
-                print(f"[DEBUG] ✓ Phrase complete! Timeout reached.")
+                logger.debug("Timeout reached, transcribing final phrase.")
 
-            # Transcribe final phrase
-            audio_np = np.frombuffer(self.phrase_bytes, dtype=np.int16).astype(np.float32) / 32768.0
-            final_text = self.audio_model.transcribe(audio_np, fp16=torch.cuda.is_available())['text'].strip()
+            # One clean pass over the whole phrase for accuracy
+            self._submit(True, self._float_slice(0, len(self.phrase_bytes)))
+            self._final_pending = True
 
-            # Reset state
-            self.phrase_bytes = bytes()
+            # Reset state (in-flight partials of this phrase are now stale)
+            self._phrase_id += 1
+            self.phrase_bytes = bytearray()
             self.phrase_time = None
+            self._decoded_offset_bytes = 0
+            # New array: the queued final pass still holds a view of the old one
+            self._float_audio = np.empty(0, dtype=np.float32)
+            self._float_cursor_bytes = 0
+            self._decoded_text = ""
+            self._last_partial_text = ""
+            self._decode_in_flight = False
 
-            result = {
-                'text': final_text,
-                'phrase_complete': True,
-                'pausing': False,
-                'time_remaining': 0,
-                'timestamp': now
-            }
-
-            if self.on_phrase_complete and final_text:
-                self.on_phrase_complete(result)
+            return STTResult(ResultKind.PAUSING, '', now, 0)
 
-            return result
-
-        # FOURTH: Still counting down (pausing state)
+        # FIFTH: Still counting down (pausing state)
         # Return pausing status with time remaining
-        return {
-            'text': '',  # No new text, just status update
-            'phrase_complete': False,
-            'pausing': True,
-            'time_remaining': max(0, time_remaining),
-            'timestamp': now
-        }
+        # No new text, just status update
+        return STTResult(ResultKind.PAUSING, '', now, max(0, time_remaining))
 
     @staticmethod
     def list_microphones() -> list:
@@ -232,7 +601,7 @@ class WhisperSTT:
 
 if __name__ == "__main__":
     # Test the Whisper STT
-    import time
+    logging.basicConfig(level=logging.DEBUG, format="%(message)s")
 
     print("Available microphones:")
     for idx, name in WhisperSTT.list_microphones():
@@ -240,14 +609,16 @@ if __name__ == "__main__":
 
     print("\nInitializing Whisper STT (base model)...")
 
-    def on_transcription(data):
-        if data['pausing']:
-            print(f"\r[PAUSING {data['time_remaining']:.1f}s] {data.get('last_text', '')}", end='', flush=True)
+    last_text = ""
+
+    def on_transcription(result):
+        if result.kind == ResultKind.PAUSING:
+            print(f"\r[PAUSING {result.time_remaining:.1f}s] {last_text}", end='', flush=True)
         else:
-            print(f"\r[LISTENING] {data['text']}", end='', flush=True)
+            print(f"\r[LISTENING] {result.text}", end='', flush=True)
 
-    def on_phrase_complete(data):
-        print(f"\n✓ COMPLETE: '{data['text']}'")
+    def on_phrase_complete(result):
+        print(f"\n✓ COMPLETE: '{result.text}'")
 
     stt = WhisperSTT(
         model="base",
@@ -263,22 +634,19 @@ if __name__ == "__main__":
 
     print("\n🎤 Listening... (Ctrl+C to stop)\n")
 
-    last_text = ""
     try:
         while True:
-            result = stt.process_audio_queue()
+            result = stt.wait_and_process()
             if result:
-                if result['pausing']:
-                    # Store last text for display during pause
-                    result['last_text'] = last_text
+                if result.kind == ResultKind.PAUSING:
+                    # Shows last_text during the pause
                     on_transcription(result)
-                elif not result['phrase_complete']:
-                    last_text = result['text']
+                elif result.kind == ResultKind.PARTIAL:
+                    last_text = result.text
                     on_transcription(result)
-                elif result['phrase_complete']:
+                else:
                     on_phrase_complete(result)
                     last_text = ""
-            time.sleep(0.25)
     except KeyboardInterrupt:
         print("\n\nStopping...")
-        stt.stop_listening()
+        stt.shutdown()
@@ -42,7 +42,7 @@ fi
 # Check Python dependencies
 echo ""
 echo "Checking Python dependencies..."
-if python3 -c "import fastapi, uvicorn, whisper, speech_recognition, PyPDF2, pyttsx3" 2>/dev/null; then
+if python3 -c "import fastapi, uvicorn, whisper, speech_recognition, pypdf, pyttsx3" 2>/dev/null; then
     echo "✓ All Python dependencies installed"
 else
     echo "✗ Missing dependencies!"